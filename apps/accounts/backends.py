@@ -0,0 +1,97 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+
+def get_auth_timeout():
+    """
+    Время жизни закешированного пользователя и его прав (в секундах)
+    """
+    return getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60 * 60)
+
+
+def get_user_version(user_id):
+    return cache.get_or_set(f'auth-user-version-{user_id}', time.time_ns, None)
+
+
+def get_permissions_version():
+    return cache.get_or_set('auth-permissions-version', time.time_ns, None)
+
+
+def bump_version(version_key):
+    """
+    Новая версия - уникальная метка времени без срока жизни: версия никогда не
+    возвращается к старому значению (incr файлового кеша записал бы ключ на 300 с,
+    после истечения вернулась бы версия 1 и закешированный по ней пользователь)
+    """
+    cache.set(version_key, time.time_ns(), None)
+
+
+def invalidate_user_cache(*user_ids):
+    """
+    Сброс закешированного пользователя, профиля и прав
+    """
+    for user_id in user_ids:
+        bump_version(f'auth-user-version-{user_id}')
+
+
+def invalidate_permissions_cache():
+    """
+    Сброс закешированных прав всех пользователей (при изменении прав групп)
+    """
+    bump_version('auth-permissions-version')
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    Бэкенд авторизации, который хранит пользователя вместе с профилем и правами в кеше
+    """
+
+    def get_user(self, user_id):
+        cache_key = f'auth-user-{user_id}-v{get_user_version(user_id)}'
+        user = cache.get(cache_key)
+        if user is None:
+            user = User._default_manager.select_related('profile').filter(pk=user_id).first()
+            if user is None:
+                return None
+            cache.set(cache_key, user, get_auth_timeout())
+        return user if self.user_can_authenticate(user) else None
+
+    def _load_permissions(self, user_obj):
+        """
+        Права пользователя и его групп из кеша или из базы данных
+        """
+        if hasattr(user_obj, '_perm_cache'):
+            return
+        cache_key = (f'auth-permissions-{user_obj.pk}-v{get_user_version(user_obj.pk)}'
+                     f'-g{get_permissions_version()}')
+        permissions = cache.get(cache_key)
+        if permissions is None:
+            permissions = (
+                super().get_user_permissions(user_obj),
+                super().get_group_permissions(user_obj),
+            )
+            cache.set(cache_key, permissions, get_auth_timeout())
+        user_obj._user_perm_cache, user_obj._group_perm_cache = permissions
+        user_obj._perm_cache = permissions[0] | permissions[1]
+
+    def get_user_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        self._load_permissions(user_obj)
+        return user_obj._user_perm_cache
+
+    def get_group_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        self._load_permissions(user_obj)
+        return user_obj._group_perm_cache
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        self._load_permissions(user_obj)
+        return user_obj._perm_cache
@@ -0,0 +1,52 @@
+from django.core.cache import cache
+
+from .models import Profile
+
+
+class AuthorDataLoader:
+    """
+    Пакетная загрузка профилей и статусов «онлайн» всех авторов страницы:
+    один запрос за профилями и один cache.get_many за отметками присутствия
+    """
+
+    def __init__(self):
+        self._user_ids = set()
+        self._profiles = {}
+
+    def add(self, *user_ids):
+        """
+        Регистрация id пользователей, которые будут показаны на странице
+        """
+        self._user_ids.update(user_id for user_id in user_ids if user_id is not None)
+
+    def load(self):
+        """
+        Загрузка профилей и присутствия для ещё не загруженных пользователей
+        """
+        missing = self._user_ids.difference(self._profiles)
+        if not missing:
+            return
+        profiles = Profile.objects.select_related('user').filter(user_id__in=missing)
+        last_seen = cache.get_many([f'last-seen-{user_id}' for user_id in missing])
+        for profile in profiles:
+            profile.set_online(f'last-seen-{profile.user_id}' in last_seen)
+            self._profiles[profile.user_id] = profile
+
+    def get_profile(self, user_id):
+        """
+        Профиль пользователя из предзагруженных данных
+        """
+        if user_id not in self._profiles:
+            self.add(user_id)
+            self.load()
+        return self._profiles.get(user_id)
+
+
+def get_author_loader(request):
+    """
+    Загрузчик данных авторов, общий для всего запроса
+    """
+    loader = getattr(request, '_author_loader', None)
+    if loader is None:
+        loader = request._author_loader = AuthorDataLoader()
+    return loader
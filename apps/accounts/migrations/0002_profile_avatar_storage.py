@@ -0,0 +1,20 @@
+# Generated by Django 5.1 on 2026-10-19 01:05
+
+import apps.services.storage
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='profile',
+            name='avatar',
+            field=models.ImageField(blank=True, default='images/avatars/default.png', storage=apps.services.storage.ContentAddressedStorage(), upload_to='images/avatars/%Y/%m/%d/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=('png', 'jpg', 'jpeg')), apps.services.storage.validate_upload_size], verbose_name='Аватар'),
+        ),
+    ]
@@ -5,9 +5,19 @@ from django.urls import reverse
 from django.utils import timezone
 from django.core.cache import cache
 
+from apps.services.objectcache import CachedObjectManager
+from apps.services.storage import content_storage, validate_upload_size
 from apps.services.utils import unique_slugify
 
 
+class ProfileManager(CachedObjectManager):
+    """
+    Менеджер профилей с кешем объектов (вместе с пользователем)
+    """
+
+    cache_related = ('user',)
+
+
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     slug = models.SlugField(verbose_name='URL', max_length=255, blank=True, unique=True)
@@ -16,11 +26,14 @@ class Profile(models.Model):
         upload_to='images/avatars/%Y/%m/%d/',
         default='images/avatars/default.png',
         blank=True,
-        validators=[FileExtensionValidator(allowed_extensions=('png', 'jpg', 'jpeg'))],
+        storage=content_storage,
+        validators=[FileExtensionValidator(allowed_extensions=('png', 'jpg', 'jpeg')), validate_upload_size],
     )
     bio = models.TextField(max_length=500, blank=True, verbose_name='Информация о себе')
     birth_date = models.DateField(null=True, blank=True, verbose_name='Дата рождения')
 
+    objects = ProfileManager()
+
     class Meta:
         """
         Сортировка, название таблицы в базе данных
@@ -46,13 +59,21 @@ class Profile(models.Model):
         return self.user.username
 
     def is_online(self):
-        cache_key = f'last-seen-{self.user.id}'
+        if hasattr(self, '_is_online'):
+            return self._is_online
+        cache_key = f'last-seen-{self.user_id}'
         last_seen = cache.get(cache_key)
 
         if last_seen is not None:
             return True
         return False
 
+    def set_online(self, value):
+        """
+        Сохранение заранее загруженного статуса присутствия
+        """
+        self._is_online = value
+
     def get_absolute_url(self):
         """
         Ссылка на профиль
@@ -0,0 +1,34 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.utils import timezone
+
+
+class SessionStore(CachedDBStore):
+    """
+    Хранилище сессий: данные читаются из общего файлового кеша, при промахе -
+    из базы данных, запись идёт в базу и в кеш
+    """
+
+    cache_key_prefix = 'blog.sessions.'
+
+    @classmethod
+    def clear_expired(cls):
+        """
+        Удаление просроченных сессий пачками по SESSION_PURGE_BATCH_SIZE вместо одного большого DELETE
+        """
+        batch_size = getattr(settings, 'SESSION_PURGE_BATCH_SIZE', 1000)
+        model = cls.get_model_class()
+        now = timezone.now()
+        while True:
+            keys = list(
+                model.objects.filter(expire_date__lt=now)
+                .values_list('session_key', flat=True)[:batch_size]
+            )
+            if not keys:
+                break
+            model.objects.filter(session_key__in=keys).delete()
+
+    @classmethod
+    async def aclear_expired(cls):
+        await sync_to_async(cls.clear_expired)()
@@ -1,7 +1,10 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
-from django.contrib.auth.models import User
+from django.contrib.auth.models import User, Group
 
+from apps.services.cache import invalidate_layout
+
+from .backends import invalidate_user_cache, invalidate_permissions_cache
 from .models import Profile
 
 
@@ -9,3 +12,63 @@ from .models import Profile
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
         Profile.objects.create(user=instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Profile)
+def invalidate_header(sender, instance, update_fields=None, **kwargs):
+    """
+    Сброс кеша шапки сайта при изменении имени пользователя или профиля
+    """
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    invalidate_layout('header')
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Сброс закешированного пользователя при изменении или удалении
+    """
+    invalidate_user_cache(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Profile)
+def invalidate_cached_user_profile(sender, instance, **kwargs):
+    invalidate_user_cache(instance.user_id)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_cached_user_permissions(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Сброс закешированных прав при изменении групп и прав пользователя
+    """
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate_user_cache(instance.pk)
+    elif pk_set and sender is User.groups.through:
+        invalidate_user_cache(*pk_set)
+    else:
+        invalidate_permissions_cache()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_cached_group_permissions(sender, action, **kwargs):
+    if action.startswith('post_'):
+        invalidate_permissions_cache()
+
+
+@receiver([post_save, post_delete], sender=Profile)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    Profile.objects.invalidate(instance.pk, slugs=[instance.slug])
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_profile_on_user_save(sender, instance, created, **kwargs):
+    """
+    Закешированный профиль хранит пользователя, включая время последнего входа
+    """
+    if not created:
+        Profile.objects.invalidate(*Profile.objects.filter(user=instance).values_list('pk', flat=True))
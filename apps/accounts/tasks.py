@@ -0,0 +1,11 @@
+from apps.tasks.registry import task
+
+from .sessions import SessionStore
+
+
+@task(name='accounts.clear_expired_sessions')
+def clear_expired_sessions():
+    """
+    Удаление просроченных сессий пачками
+    """
+    SessionStore.clear_expired()
@@ -0,0 +1,12 @@
+from django import template
+
+
+register = template.Library()
+
+
+@register.filter
+def author_profile(user_id, loader):
+    """
+    Профиль автора из загрузчика страницы: {{ node.author_id|author_profile:authors }}
+    """
+    return loader.get_profile(user_id)
@@ -4,6 +4,9 @@ from django.contrib.messages.views import SuccessMessageMixin
 from django.db import transaction
 from django.urls import reverse_lazy
 
+from ..services.mixins import CachedObjectMixin
+from ..services.ratelimit import RateLimitMixin
+
 from .models import Profile
 from .forms import (UserUpdateForm, ProfileUpdateForm,
                     UserRegisterForm, UserLoginForm)
@@ -17,11 +20,12 @@ class UserLogoutView(LogoutView):
     next_page = 'home'
 
 
-class UserLoginView(SuccessMessageMixin, LoginView):
+class UserLoginView(RateLimitMixin, SuccessMessageMixin, LoginView):
     """
     Авторизация на сайте
     """
 
+    ratelimit_group = 'login'
     form_class = UserLoginForm
     template_name = 'accounts/user_login.html'
     next_page = 'home'
@@ -33,11 +37,12 @@ class UserLoginView(SuccessMessageMixin, LoginView):
         return context
 
 
-class UserRegisterView(SuccessMessageMixin, CreateView):
+class UserRegisterView(RateLimitMixin, SuccessMessageMixin, CreateView):
     """
     Представление регистрации на сайте с формой регистрации
     """
 
+    ratelimit_group = 'register'
     form_class = UserRegisterForm
     success_url = reverse_lazy('home')
     template_name = 'accounts/user_register.html'
@@ -49,8 +54,10 @@ class UserRegisterView(SuccessMessageMixin, CreateView):
         return context
 
 
-class ProfileDetailView(DetailView):
+class ProfileDetailView(CachedObjectMixin, DetailView):
     model = Profile
+    # Статистика автора меняется с каждой оценкой, поэтому не кешируется вместе с профилем
+    object_prefetch = ('user__author_stats',)
     context_object_name = 'profile'
     template_name = 'accounts/profile_detail.html'
 
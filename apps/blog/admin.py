@@ -1,7 +1,21 @@
 from django.contrib import admin
+from django.db import transaction
+from django.utils import timezone
 from django_mptt_admin.admin import DjangoMpttAdmin
 
-from .models import Post, Category, Comment, Rating
+from taggit.models import Tag
+
+from apps.services.cache import invalidate_layout
+from apps.services.paginator import EstimatedCountPaginator
+from apps.services.utils import bulk_delete
+
+from .autocomplete import autocomplete_index, post_entry
+from .forms import PostAdminForm
+from .models import Post, Category, Comment, Rating, AuthorStats, PostArchiveMonth, TagPostCount, Notification
+from .sitemaps import invalidate_sitemap_queryset
+from .snapshot import FULL_REBUILD, get_post_paths, is_snapshot_enabled, mark_dirty
+from .rollups import remove_votes
+from .tasks import rebuild_author_stats
 
 
 @admin.register(Rating)
@@ -10,16 +24,70 @@ class RatingAdmin(admin.ModelAdmin):
     Админ-панель модели рейтинга
     """
 
-    pass
+    list_display = ('id', 'post', 'user', 'value', 'ip_address', 'time_create')
+    list_select_related = ('post', 'user')
+    raw_id_fields = ('post', 'user')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('delete_by_ip',)
+
+    @admin.action(description='Удалить все оценки с IP-адресов выбранных оценок')
+    def delete_by_ip(self, request, queryset):
+        """
+        Удаление одним DELETE без загрузки строк и сигналов: свёртки поправляются
+        сгруппированными разницами, статистика авторов пересчитывается в фоне
+        """
+        ip_addresses = set(queryset.values_list('ip_address', flat=True))
+        ratings = Rating.objects.filter(ip_address__in=ip_addresses)
+        author_ids = set(ratings.order_by().values_list('post__author_id', flat=True).distinct())
+        post_ids = set(ratings.order_by().values_list('post_id', flat=True).distinct())
+        with transaction.atomic():
+            remove_votes(ratings)
+            deleted = bulk_delete(ratings)
+        rebuild_author_stats.enqueue(user_ids=sorted(author_ids))
+        if is_snapshot_enabled():
+            mark_dirty(*get_post_paths(post_ids))
+        self.message_user(request, f'Удалено оценок: {deleted}')
+
+
+@admin.register(AuthorStats)
+class AuthorStatsAdmin(admin.ModelAdmin):
+    """
+    Админ-панель статистики авторов (только просмотр, данные пересчитываются сигналами)
+    """
+
+    list_display = ('user', 'post_count', 'rating_total', 'comment_count', 'last_activity')
+    list_select_related = ('user',)
+    readonly_fields = ('user', 'post_count', 'rating_total', 'comment_count', 'last_activity')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'kind', 'post', 'actor', 'created', 'is_read', 'is_sent')
+    list_filter = ('kind', 'is_read', 'is_sent')
+    list_select_related = ('recipient', 'post', 'actor')
+    raw_id_fields = ('recipient', 'post', 'actor')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Comment)
-class CommentAdminPage(DjangoMpttAdmin):
+class CommentAdminPage(admin.ModelAdmin):
     """
-    Админ-панель модели комментариев
+    Админ-панель модели комментариев: обычный постраничный список вместо дерева
+    django-mptt-admin, которое загружает все корневые комментарии сразу
     """
 
-    pass
+    list_display = ('id', 'author', 'post', 'status', 'time_create')
+    list_select_related = ('author', 'post')
+    list_filter = ('status',)
+    raw_id_fields = ('post', 'author', 'parent')
+    # Сортировка по первичному ключу без временного B-дерева
+    ordering = ('-id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Category)
@@ -30,5 +98,65 @@ class CategoryAdmin(DjangoMpttAdmin):
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
-    list_display = ('id', 'title', 'category')
+    form = PostAdminForm
+    list_display = ('id', 'title', 'category', 'author', 'status', 'fixed', 'create')
+    list_select_related = ('category', 'author')
+    list_filter = ('status', 'fixed')
+    raw_id_fields = ('author', 'updater')
     prepopulated_fields = {'slug': ('title',)}
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('make_published', 'make_draft', 'make_fixed', 'make_unfixed')
+
+    def bulk_update(self, request, queryset, **values):
+        """
+        Массовое изменение записей одним UPDATE с пересчётом зависимых счётчиков
+        """
+        affected = queryset.exclude(**values)
+        if 'status' in values:
+            author_ids = set(affected.order_by().values_list('author_id', flat=True).distinct())
+            months = {(moment.year, moment.month) for moment in affected.datetimes('create', 'month')}
+        invalidate_sitemap_queryset('posts', affected)
+        affected_ids = list(affected.values_list('pk', flat=True))
+        if 'status' in values:
+            tag_ids = set(Tag.objects.filter(post__in=affected).values_list('pk', flat=True))
+        updated = affected.update(update=timezone.now(), **values)
+        Post.objects.invalidate(*affected_ids)
+        if 'status' in values and updated:
+            # Пересчёт счётчиков - в фоне, архив и облако тегов нужны боковой панели сразу
+            rebuild_author_stats.enqueue(user_ids=sorted(author_ids))
+            PostArchiveMonth.objects.rebuild(months=months)
+            TagPostCount.objects.rebuild(tag_ids=tag_ids)
+            invalidate_layout('sidebar')
+            mark_dirty(FULL_REBUILD)
+            self.update_autocomplete(affected_ids, values['status'])
+        elif updated and affected_ids and is_snapshot_enabled():
+            mark_dirty(*get_post_paths(affected_ids))
+        self.message_user(request, f'Изменено записей: {updated}')
+
+    def update_autocomplete(self, post_ids, status):
+        """
+        Подсказки поиска при массовой смене статуса (UPDATE не отправляет сигналы)
+        """
+        if status != 'published':
+            for post_id in post_ids:
+                autocomplete_index.remove(('post', post_id))
+            return
+        for post_id, title, slug in Post.objects.filter(pk__in=post_ids).values_list('id', 'title', 'slug'):
+            autocomplete_index.put(*post_entry(post_id, title, slug))
+
+    @admin.action(description='Опубликовать выбранные записи')
+    def make_published(self, request, queryset):
+        self.bulk_update(request, queryset, status='published')
+
+    @admin.action(description='Снять с публикации выбранные записи')
+    def make_draft(self, request, queryset):
+        self.bulk_update(request, queryset, status='draft')
+
+    @admin.action(description='Прикрепить выбранные записи')
+    def make_fixed(self, request, queryset):
+        self.bulk_update(request, queryset, fixed=True)
+
+    @admin.action(description='Открепить выбранные записи')
+    def make_unfixed(self, request, queryset):
+        self.bulk_update(request, queryset, fixed=False)
@@ -0,0 +1,261 @@
+import base64
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import Http404, HttpResponse, HttpResponseNotModified, JsonResponse
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from django.views.generic import View
+
+from taggit.models import Tag
+
+from .models import Post, Category, Comment
+
+
+class ApiField:
+    """
+    Поле ответа API: какие поля модели загрузить и как получить значение
+    """
+
+    def __init__(self, getter, only=(), prefetch=None):
+        self.getter = getter
+        self.only = only
+        self.prefetch = prefetch
+
+
+def encode_cursor(*values):
+    return base64.urlsafe_b64encode(':'.join(map(str, values)).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        return [int(value) for value in base64.urlsafe_b64decode(cursor.encode()).decode().split(':')]
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def serialize_comment(comment):
+    """
+    Комментарий в формате, который используют comments.js и поток событий записи
+    """
+    profile = comment.author.profile
+    return {
+        'is_child': comment.is_child_node(),
+        'id': comment.id,
+        'author': comment.author.username,
+        'parent_id': comment.parent_id,
+        'time_create': comment.time_create.strftime('%Y-%b-%d %H:%M:%S'),
+        'avatar': profile.avatar.url,
+        'content': comment.content,
+        'get_absolute_url': profile.get_absolute_url(),
+    }
+
+
+class ApiView(View):
+    """
+    Базовое представление API только для чтения: разреженные поля (?fields=),
+    курсорная пагинация (?cursor=) и строгие ETag
+    """
+
+    api_fields = {}
+    default_fields = ()
+    page_size = 20
+    many = True
+
+    def get_base_queryset(self):
+        raise NotImplementedError
+
+    def get_fields(self):
+        requested = self.request.GET.get('fields')
+        if not requested:
+            return list(self.default_fields)
+        fields = [field.strip() for field in requested.split(',') if field.strip()]
+        unknown = set(fields).difference(self.api_fields)
+        if unknown:
+            raise ValueError(f'Неизвестные поля: {", ".join(sorted(unknown))}')
+        return fields
+
+    def get_queryset(self, fields):
+        """
+        Выборка только нужных колонок (only) и связей (select_related/prefetch_related)
+        """
+        queryset = self.get_base_queryset().select_related(None)
+        only, related, prefetch = {'pk'}, set(), []
+        for name in fields:
+            field = self.api_fields[name]
+            only.update(field.only)
+            related.update(path.rsplit('__', 1)[0] for path in field.only if '__' in path)
+            if field.prefetch:
+                prefetch.append(field.prefetch)
+        only.update(self.get_cursor_fields())
+        return queryset.select_related(*related).prefetch_related(*prefetch).only(*only)
+
+    def get_cursor_fields(self):
+        return ('id',)
+
+    def paginate(self, queryset):
+        """
+        Курсорная пагинация по убыванию первичного ключа
+        """
+        cursor = self.request.GET.get('cursor')
+        if cursor:
+            values = decode_cursor(cursor)
+            if not values:
+                raise ValueError('Некорректный курсор')
+            queryset = queryset.filter(id__lt=values[0])
+        objects = list(queryset.order_by('-id')[:self.page_size + 1])
+        next_cursor = encode_cursor(objects[self.page_size - 1].id) if len(objects) > self.page_size else None
+        return objects[:self.page_size], next_cursor
+
+    def serialize(self, obj, fields):
+        return {name: self.api_fields[name].getter(obj) for name in fields}
+
+    def get_next_url(self, next_cursor):
+        if next_cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params['cursor'] = next_cursor
+        return f'{self.request.path}?{params.urlencode()}'
+
+    def get(self, request, *args, **kwargs):
+        try:
+            fields = self.get_fields()
+            queryset = self.get_queryset(fields)
+            if self.many:
+                objects, next_cursor = self.paginate(queryset)
+                payload = {
+                    'results': [self.serialize(obj, fields) for obj in objects],
+                    'next': self.get_next_url(next_cursor),
+                }
+            else:
+                obj = queryset.first()
+                if obj is None:
+                    raise Http404
+                payload = self.serialize(obj, fields)
+        except ValueError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        return self.render_json(payload)
+
+    def render_json(self, payload):
+        """
+        Ответ со строгим ETag по содержимому, при совпадении If-None-Match - 304
+        """
+        content = json.dumps(payload, cls=DjangoJSONEncoder, ensure_ascii=False).encode()
+        etag = f'"{hashlib.sha1(content).hexdigest()}"'
+        if etag in parse_etags(self.request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type='application/json')
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+
+POST_FIELDS = {
+    'id': ApiField(lambda post: post.id, only=('id',)),
+    'title': ApiField(lambda post: post.title, only=('title',)),
+    'slug': ApiField(lambda post: post.slug, only=('slug',)),
+    'url': ApiField(lambda post: post.get_absolute_url(), only=('slug',)),
+    'description': ApiField(lambda post: post.description, only=('description',)),
+    'text': ApiField(lambda post: post.text, only=('body__text',)),
+    'thumbnail': ApiField(lambda post: post.thumbnail.url, only=('thumbnail',)),
+    'create': ApiField(lambda post: post.create, only=('create',)),
+    'update': ApiField(lambda post: post.update, only=('update',)),
+    'fixed': ApiField(lambda post: post.fixed, only=('fixed',)),
+    'author': ApiField(lambda post: post.author.username, only=('author__username',)),
+    'category': ApiField(lambda post: post.category.slug, only=('category__slug',)),
+    'tags': ApiField(lambda post: [tag.name for tag in post.tags.all()],
+                     prefetch='tags'),
+}
+
+
+class PostListApiView(ApiView):
+    api_fields = POST_FIELDS
+    default_fields = ('id', 'title', 'slug', 'url', 'description', 'thumbnail',
+                      'create', 'update', 'author', 'category')
+
+    def get_base_queryset(self):
+        return Post.custom.all()
+
+
+class PostDetailApiView(PostListApiView):
+    default_fields = PostListApiView.default_fields + ('text', 'tags')
+    many = False
+
+    def get_base_queryset(self):
+        return Post.custom.filter(slug=self.kwargs['slug'])
+
+
+class CategoryListApiView(ApiView):
+    api_fields = {
+        'id': ApiField(lambda category: category.id, only=('id',)),
+        'title': ApiField(lambda category: category.title, only=('title',)),
+        'slug': ApiField(lambda category: category.slug, only=('slug',)),
+        'description': ApiField(lambda category: category.description, only=('description',)),
+        'parent_id': ApiField(lambda category: category.parent_id, only=('parent',)),
+        'level': ApiField(lambda category: category.level, only=('level',)),
+    }
+    default_fields = ('id', 'title', 'slug', 'parent_id', 'level')
+    page_size = 100
+
+    def get_base_queryset(self):
+        return Category.objects.all()
+
+
+class TagListApiView(ApiView):
+    api_fields = {
+        'id': ApiField(lambda tag: tag.id, only=('id',)),
+        'name': ApiField(lambda tag: tag.name, only=('name',)),
+        'slug': ApiField(lambda tag: tag.slug, only=('slug',)),
+    }
+    default_fields = ('id', 'name', 'slug')
+    page_size = 100
+
+    def get_base_queryset(self):
+        return Tag.objects.all()
+
+
+class CommentThreadApiView(ApiView):
+    """
+    Дерево комментариев записи в порядке обхода (новые ветки первыми)
+    """
+
+    api_fields = {
+        'id': ApiField(lambda comment: comment.id, only=('id',)),
+        'parent_id': ApiField(lambda comment: comment.parent_id, only=('parent',)),
+        'level': ApiField(lambda comment: comment.level, only=('level',)),
+        'author': ApiField(lambda comment: comment.author.username, only=('author__username',)),
+        'content': ApiField(lambda comment: comment.content, only=('content',)),
+        'time_create': ApiField(lambda comment: comment.time_create, only=('time_create',)),
+    }
+    default_fields = ('id', 'parent_id', 'level', 'author', 'content', 'time_create')
+    page_size = 50
+
+    def get_base_queryset(self):
+        post_ids = Post.custom.filter(slug=self.kwargs['slug']).order_by().values_list('pk', flat=True)[:1]
+        if not post_ids:
+            raise Http404
+        return Comment.objects.filter(post_id=post_ids[0])
+
+    def get_cursor_fields(self):
+        return ('tree_id', 'lft')
+
+    def paginate(self, queryset):
+        """
+        Курсор по (tree_id, lft) - порядок обхода дерева MPTT
+        """
+        cursor = self.request.GET.get('cursor')
+        if cursor:
+            values = decode_cursor(cursor)
+            if not values or len(values) != 2:
+                raise ValueError('Некорректный курсор')
+            tree_id, lft = values
+            queryset = queryset.filter(Q(tree_id__lt=tree_id) | Q(tree_id=tree_id, lft__gt=lft))
+        objects = list(queryset.order_by('-tree_id', 'lft')[:self.page_size + 1])
+        next_cursor = None
+        if len(objects) > self.page_size:
+            last = objects[self.page_size - 1]
+            next_cursor = encode_cursor(last.tree_id, last.lft)
+        return objects[:self.page_size], next_cursor
@@ -5,3 +5,10 @@ class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        from django.core import checks
+        from apps.services.ratelimit import check_ratelimit_cache
+
+        import apps.blog.signals
+        checks.register(check_ratelimit_cache, checks.Tags.caches)
@@ -0,0 +1,37 @@
+from django.urls import reverse
+
+from taggit.models import Tag
+
+from apps.accounts.models import Profile
+from apps.services.autocomplete import SharedPrefixIndex
+
+from .models import Post
+
+
+def post_entry(post_id, title, slug):
+    return ('post', post_id), title, reverse('post_detail', args=[slug])
+
+
+def tag_entry(tag_id, name, slug):
+    return ('tag', tag_id), name, reverse('post_by_tags', args=[slug])
+
+
+def profile_entry(profile_id, slug, username):
+    return ('profile', profile_id), username, reverse('profile_detail', args=[slug])
+
+
+def load_entries():
+    """
+    Элементы индекса в порядке важности: при нехватке бюджета памяти
+    отбрасываются самые старые записи
+    """
+    for tag_id, name, slug in Tag.objects.values_list('id', 'name', 'slug').iterator():
+        yield tag_entry(tag_id, name, slug)
+    for profile_id, slug, username in Profile.objects.values_list('id', 'slug', 'user__username').iterator():
+        yield profile_entry(profile_id, slug, username)
+    posts = Post.custom.select_related(None).order_by('-create').values_list('id', 'title', 'slug')
+    for post_id, title, slug in posts.iterator():
+        yield post_entry(post_id, title, slug)
+
+
+autocomplete_index = SharedPrefixIndex('blog', load_entries)
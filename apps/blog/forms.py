@@ -20,7 +20,26 @@ class CommentCreateForm(forms.ModelForm):
         fields = ('content',)
 
 
-class PostCreateForm(forms.ModelForm):
+class PostBodyForm(forms.ModelForm):
+    """
+    Полный текст записи хранится в PostBody, поэтому поле формы объявлено явно
+    и переносится в запись при сохранении
+    """
+
+    text = forms.CharField(label='Полный текст записи', widget=CKEditorWidget(config_name='awesome_ckeditor'))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk and 'text' not in self.initial:
+            self.initial['text'] = self.instance.text
+
+    def save(self, commit=True):
+        if 'text' in self.changed_data or self.instance.pk is None:
+            self.instance.text = self.cleaned_data['text']
+        return super().save(commit)
+
+
+class PostCreateForm(PostBodyForm):
     """
     Форма добавления статей на сайте
     """
@@ -41,6 +60,16 @@ class PostCreateForm(forms.ModelForm):
             self.fields[field].widget.attrs.update({'class': 'form-control', 'autocomplete': 'off'})
 
 
+class PostAdminForm(PostBodyForm):
+    """
+    Форма записи в админ-панели
+    """
+
+    class Meta:
+        model = Post
+        fields = '__all__'
+
+
 class PostUpdateForm(PostCreateForm):
     """
     Форма обновления статьи на сайте
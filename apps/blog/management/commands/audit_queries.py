@@ -0,0 +1,188 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import NoReverseMatch, URLPattern, URLResolver, get_resolver, resolve, reverse
+
+from apps.blog.models import Post, Category, Comment, Rating
+from apps.services.queryaudit import QueryRecorder, analyze_plan, explain, fingerprint
+
+
+AUDIT_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'audit'},
+    'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'audit-sessions'},
+}
+SKIPPED_NAMESPACES = ('admin',)
+SKIPPED_NAMES = ('static', 'logout')
+
+
+def seed():
+    """
+    Тестовые данные: авторы, дерево категорий, опубликованные записи и черновики,
+    теги, ветки комментариев и оценки
+    """
+    authors = [User.objects.create_user(f'author{number}', password='audit-password') for number in range(3)]
+    parent = Category.objects.create(title='Программирование', slug='programming')
+    categories = [
+        parent,
+        Category.objects.create(title='Python', slug='python', parent=parent),
+        Category.objects.create(title='Django', slug='django', parent=parent),
+        Category.objects.create(title='Разное', slug='misc'),
+    ]
+    posts = []
+    for number in range(30):
+        post = Post.objects.create(
+            title=f'Запись {number}', description='Описание', text='<p>Текст</p>',
+            category=categories[number % len(categories)], author=authors[number % len(authors)],
+            status='draft' if number % 5 == 0 else 'published', fixed=number == 1,
+        )
+        post.tags.add(f'tag-{number % 4}', 'common')
+        posts.append(post)
+    for post in posts[:10]:
+        root = Comment.objects.create(post=post, author=authors[0], content='Комментарий')
+        Comment.objects.create(post=post, author=authors[1], content='Ответ', parent=root)
+        for number in range(5):
+            Rating.objects.create(post=post, ip_address=f'10.0.0.{number}', value=1 if number % 2 else -1)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return {
+        'author': authors[1],
+        'post': posts[1],
+        'category': categories[1],
+        'tag': posts[1].tags.first(),
+        'comment': posts[1].comments.filter(level=0).first(),
+    }
+
+
+def get_url_kwargs(name, objects):
+    """
+    Значения параметров адреса из тестовых данных
+    """
+    post, category = objects['post'], objects['category']
+    slugs = {
+        'post_by_category': category.slug,
+        'profile_detail': objects['author'].profile.slug,
+    }
+    pks = {
+        'comment_replies': objects['comment'].pk,
+    }
+    return {
+        'slug': slugs.get(name, post.slug),
+        'pk': pks.get(name, post.pk),
+        'tag': objects['tag'].slug,
+        'year': post.create.year,
+        'month': post.create.month,
+        'section': 'posts',
+        'chunk': 0,
+    }
+
+
+def iter_url_names(patterns=None, namespace=None):
+    for pattern in patterns if patterns is not None else get_resolver().url_patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace in SKIPPED_NAMESPACES:
+                continue
+            nested = ':'.join(filter(None, (namespace, pattern.namespace)))
+            yield from iter_url_names(pattern.url_patterns, nested or None)
+        elif isinstance(pattern, URLPattern) and pattern.name and pattern.name not in SKIPPED_NAMES:
+            yield f'{namespace}:{pattern.name}' if namespace else pattern.name, pattern
+
+
+def reverse_with(name, pattern, values):
+    params = list(pattern.pattern.converters)
+    try:
+        return reverse(name, kwargs={param: values[param] for param in params})
+    except (KeyError, NoReverseMatch):
+        return None
+
+
+class Command(BaseCommand):
+    help = ('Аудит SQL-запросов: обход адресов на тестовой базе, EXPLAIN QUERY PLAN каждого '
+            'запроса, поиск полных просмотров таблиц, временных B-деревьев и отсутствующих индексов')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--baseline', default=str(settings.BASE_DIR / 'query_audit_baseline.json'),
+                            help='Файл базовой линии известных находок')
+        parser.add_argument('--update-baseline', action='store_true',
+                            help='Записать текущие находки в базовую линию')
+        parser.add_argument('--ci', action='store_true',
+                            help='Завершиться с ошибкой, если появились находки не из базовой линии')
+        parser.add_argument('--json', action='store_true', help='Вывод отчёта в JSON')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Аудит планов запросов поддерживает только SQLite')
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(CACHES=AUDIT_CACHES, SNAPSHOT_ENABLED=False, RATE_LIMITS={}):
+                findings = self.audit(seed())
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        baseline_path = Path(options['baseline'])
+        baseline = set(json.loads(baseline_path.read_text())) if baseline_path.exists() else set()
+        for finding in findings:
+            finding['new'] = finding['id'] not in baseline
+
+        if options['json']:
+            self.stdout.write(json.dumps(findings, ensure_ascii=False, indent=2))
+        else:
+            self.report(findings)
+
+        if options['update_baseline']:
+            baseline_path.write_text(json.dumps(sorted({finding['id'] for finding in findings}), indent=2) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Базовая линия обновлена: {baseline_path}'))
+        new = [finding for finding in findings if finding['new']]
+        if options['ci'] and new:
+            raise CommandError(f'Новых проблем в планах запросов: {len(new)}')
+
+    def audit(self, objects):
+        """
+        Обход всех именованных адресов анонимом и автором с записью и разбором запросов
+        """
+        author_client = Client(raise_request_exception=False)
+        author_client.force_login(objects['author'])
+        clients = (('аноним', Client(raise_request_exception=False)), ('автор', author_client))
+        findings = {}
+        for name, pattern in iter_url_names():
+            url = reverse_with(name, pattern, get_url_kwargs(name, objects))
+            if url is None:
+                self.stderr.write(f'Пропущен адрес {name}: нет значений параметров')
+                continue
+            view = resolve(url)._func_path
+            for user_label, client in clients:
+                recorder = QueryRecorder()
+                with connection.execute_wrapper(recorder):
+                    client.get(url)
+                for query in recorder.queries:
+                    if not query['sql'].lstrip().upper().startswith(('SELECT', 'WITH')):
+                        continue
+                    plan = explain(connection, query['sql'], query['params'])
+                    for kind, subject, detail in analyze_plan(plan):
+                        finding_id = fingerprint(kind, subject, view, query['sql'])
+                        finding = findings.setdefault(finding_id, {
+                            'id': finding_id, 'kind': kind, 'subject': subject, 'plan': detail,
+                            'view': view, 'url': url, 'users': [],
+                            'template': query['template'], 'code': query['code'], 'sql': query['sql'],
+                        })
+                        if user_label not in finding['users']:
+                            finding['users'].append(user_label)
+        return sorted(findings.values(), key=lambda finding: (finding['kind'], finding['subject'], finding['view']))
+
+    def report(self, findings):
+        for finding in findings:
+            marker = self.style.ERROR('НОВАЯ ') if finding['new'] else ''
+            self.stdout.write(f'{marker}[{finding["kind"]}] {finding["subject"]}  {finding["view"]}  '
+                              f'{finding["url"]} ({", ".join(finding["users"])})')
+            self.stdout.write(f'    план: {finding["plan"]}')
+            self.stdout.write(f'    шаблон: {finding["template"] or "-"}  код: {finding["code"] or "-"}')
+            self.stdout.write(f'    sql: {finding["sql"][:300]}')
+        self.stdout.write(f'Всего находок: {len(findings)}, новых: {sum(finding["new"] for finding in findings)}')
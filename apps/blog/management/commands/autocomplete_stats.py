@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.blog.autocomplete import autocomplete_index
+
+
+class Command(BaseCommand):
+    help = 'Построение индекса подсказок поиска: объём, время загрузки и задержка поиска по префиксам'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queries', type=int, default=1000,
+                            help='Число запросов для замера задержки')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        index = autocomplete_index.build()
+        build_time = time.perf_counter() - started
+        stats = index.stats()
+        self.stdout.write(f'Элементов: {stats["items"]}, слов: {stats["keys"]}, '
+                          f'память: {stats["memory"] / 1024:.0f} КБ, построение: {build_time * 1000:.0f} мс')
+        if stats['truncated']:
+            self.stdout.write(self.style.WARNING('Бюджет памяти исчерпан, часть элементов не попала в индекс'))
+
+        # Запросы - префиксы из 2-4 букв слов самого индекса, каждый второй - из двух слов
+        words = [word for label, url, text, size, rank in index.items.values() for word in text.split()]
+        if not words:
+            return
+        queries = []
+        for number in range(options['queries']):
+            query = words[number % len(words)][:2 + number % 3]
+            if number % 2:
+                query = f'{words[number * 7 % len(words)]} {query}'
+            queries.append(query)
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            index.search(query)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        for label, share in (('p50', 0.5), ('p99', 0.99), ('max', 1)):
+            value = timings[min(len(timings) - 1, int(len(timings) * share))]
+            self.stdout.write(f'{label}\t{value * 1000:.3f} мс')
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.blog.sitemaps import (SITEMAP_SECTIONS, render_sitemap_index,
+                                render_sitemap_chunk)
+
+
+class Command(BaseCommand):
+    help = 'Предварительная отрисовка и кеширование всех частей карты сайта'
+
+    def handle(self, *args, **options):
+        for name, section in SITEMAP_SECTIONS.items():
+            chunks = section.get_chunks()
+            for chunk, _ in chunks:
+                render_sitemap_chunk(name, chunk)
+            self.stdout.write(f'{name}: {len(chunks)} частей')
+        render_sitemap_index()
+        self.stdout.write(self.style.SUCCESS('Карта сайта сохранена в кеш'))
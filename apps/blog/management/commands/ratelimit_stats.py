@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from apps.services.ratelimit import get_rejected_counters, reset_rejected_counters
+
+
+class Command(BaseCommand):
+    help = 'Число запросов, отклонённых ограничением частоты, по группам'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true',
+                            help='Обнулить счётчики после вывода')
+
+    def handle(self, *args, **options):
+        for group, rejected in get_rejected_counters().items():
+            self.stdout.write(f'{group}\t{rejected}')
+        if options['reset']:
+            reset_rejected_counters()
+            self.stdout.write(self.style.SUCCESS('Счётчики обнулены'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.blog.models import AuthorStats
+
+
+class Command(BaseCommand):
+    help = 'Полный пересчёт статистики авторов по записям, оценкам и комментариям'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, nargs='*', dest='user_ids',
+                            help='Пересчитать только указанных пользователей')
+
+    def handle(self, *args, **options):
+        total = AuthorStats.objects.rebuild(user_ids=options['user_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Статистика пересчитана для {total} авторов'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from apps.blog.snapshot import FULL_REBUILD, get_snapshot_root, publish, take_dirty_paths
+
+
+class Command(BaseCommand):
+    help = 'Публикация анонимных страниц в статические HTML-файлы (полная или по изменениям)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--incremental', action='store_true',
+                            help='Перегенерировать только страницы, изменённые с прошлого запуска')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Число процессов (по умолчанию - число ядер)')
+
+    def handle(self, *args, **options):
+        # Полная публикация покрывает и накопленные изменения
+        dirty = take_dirty_paths()
+        paths = dirty if options['incremental'] else {FULL_REBUILD}
+        if not paths:
+            self.stdout.write('Изменений нет')
+            return
+        results, removed = publish(paths, workers=options['workers'])
+        pages = sum(count for path, count in results)
+        self.stdout.write(self.style.SUCCESS(
+            f'{get_snapshot_root()}: адресов {len(results)}, страниц {pages}, удалено {removed}'
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.services.warmup import run_startup_report
+
+
+class Command(BaseCommand):
+    help = 'Время импорта, загрузки моделей и ready() каждого приложения при холодном запуске'
+
+    def handle(self, *args, **options):
+        report = run_startup_report()
+        rows = sorted(
+            report['apps'].values(),
+            key=lambda row: row.get('import', 0) + row.get('models', 0) + row.get('ready', 0),
+            reverse=True,
+        )
+        self.stdout.write(f'{"Приложение":<40} {"импорт":>9} {"модели":>9} {"ready":>9} {"всего":>9}')
+        for row in rows:
+            timings = [row.get('import', 0), row.get('models', 0), row.get('ready', 0)]
+            self.stdout.write(f'{row["name"]:<40} ' + ' '.join(f'{value * 1000:9.1f}' for value in timings)
+                              + f' {sum(timings) * 1000:9.1f}')
+        self.stdout.write(f'django.setup(): {report["setup"] * 1000:.1f} мс')
+        for name, elapsed in report['warmup']:
+            self.stdout.write(f'прогрев {name}: {elapsed * 1000:.1f} мс')
+        self.stdout.write(self.style.SUCCESS(f'Прогрев всего: {report["warmup_total"] * 1000:.1f} мс'))
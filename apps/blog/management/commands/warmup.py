@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from apps.services.warmup import warmup
+
+
+class Command(BaseCommand):
+    help = 'Прогрев: импорт модулей приложений, компиляция шаблонов, адреса и горячие кеши'
+
+    def handle(self, *args, **options):
+        for name, count, elapsed in warmup(raise_errors=options['traceback']):
+            status = 'ошибка' if count is None else count
+            self.stdout.write(f'{name:<10} {elapsed * 1000:8.1f} мс  {status}')
+        self.stdout.write(self.style.SUCCESS('Прогрев завершён'))
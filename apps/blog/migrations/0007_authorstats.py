@@ -0,0 +1,32 @@
+# Generated by Django 5.1 on 2026-10-19 01:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('blog', '0006_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='author_stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('post_count', models.IntegerField(default=0, verbose_name='Опубликовано записей')),
+                ('rating_total', models.IntegerField(default=0, verbose_name='Рейтинг записей')),
+                ('comment_count', models.IntegerField(default=0, verbose_name='Комментариев')),
+                ('last_activity', models.DateTimeField(blank=True, null=True, verbose_name='Последняя активность')),
+            ],
+            options={
+                'verbose_name': 'Статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+                'ordering': ('-rating_total',),
+                'indexes': [models.Index(fields=['-rating_total'], name='blog_author_rating__042812_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1 on 2026-10-19 01:02
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+
+def fill_archive_months(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    PostArchiveMonth = apps.get_model('blog', 'PostArchiveMonth')
+    rows = (
+        Post.objects.filter(status='published').order_by()
+        .annotate(month=TruncMonth('create')).values('month').annotate(total=Count('id'))
+    )
+    PostArchiveMonth.objects.bulk_create(
+        PostArchiveMonth(year=row['month'].year, month=row['month'].month, post_count=row['total'])
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_authorstats'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostArchiveMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='Год')),
+                ('month', models.PositiveSmallIntegerField(verbose_name='Месяц')),
+                ('post_count', models.IntegerField(default=0, verbose_name='Записей')),
+            ],
+            options={
+                'verbose_name': 'Месяц архива',
+                'verbose_name_plural': 'Архив по месяцам',
+                'ordering': ('-year', '-month'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', 'create'], name='blog_post_status_3562d6_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='postarchivemonth',
+            unique_together={('year', 'month')},
+        ),
+        migrations.RunPython(fill_archive_months, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1 on 2026-10-19 01:05
+
+import apps.services.storage
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_archive'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='thumbnail',
+            field=models.ImageField(blank=True, default='default.jpg', storage=apps.services.storage.ContentAddressedStorage(), upload_to='images/thumbnails/%Y/%m/%d/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=('png', 'jpg', 'webp', 'jpeg', 'gif')), apps.services.storage.validate_upload_size], verbose_name='Изображение записи'),
+        ),
+    ]
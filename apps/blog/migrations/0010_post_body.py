@@ -0,0 +1,58 @@
+# Generated by Django 5.1 on 2026-10-19 01:24
+
+import apps.services.fields
+import ckeditor.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def move_bodies(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    PostBody = apps.get_model('blog', 'PostBody')
+    batch = []
+    for post_id, text in Post.objects.order_by().values_list('id', 'text').iterator(chunk_size=500):
+        batch.append(PostBody(post_id=post_id, text=text))
+        if len(batch) == 500:
+            PostBody.objects.bulk_create(batch)
+            batch = []
+    PostBody.objects.bulk_create(batch)
+
+
+def restore_bodies(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    PostBody = apps.get_model('blog', 'PostBody')
+    for post_id, text in PostBody.objects.values_list('post_id', 'text').iterator(chunk_size=500):
+        Post.objects.filter(pk=post_id).update(text=text)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_post_thumbnail_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostBody',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='body', serialize=False, to='blog.post', verbose_name='Запись')),
+                ('text', apps.services.fields.CompressedTextField(verbose_name='Полный текст записи')),
+            ],
+            options={
+                'verbose_name': 'Текст записи',
+                'verbose_name_plural': 'Тексты записей',
+            },
+        ),
+        migrations.RunPython(move_bodies, restore_bodies),
+        # Значение по умолчанию нужно только для отката миграции: колонка
+        # восстанавливается для существующих строк, текст возвращает restore_bodies
+        migrations.AlterField(
+            model_name='post',
+            name='text',
+            field=ckeditor.fields.RichTextField(default='', verbose_name='Полный текст записи'),
+        ),
+        migrations.RemoveField(
+            model_name='post',
+            name='text',
+        ),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 5.1 on 2026-10-19 01:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_body'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingArchive',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_archive', serialize=False, to='blog.post', verbose_name='Запись')),
+                ('likes', models.PositiveIntegerField(default=0, verbose_name='Лайков')),
+                ('dislikes', models.PositiveIntegerField(default=0, verbose_name='Дизлайков')),
+                ('voters', models.BinaryField(default=b'', verbose_name='Хеши IP-адресов')),
+            ],
+            options={
+                'verbose_name': 'Архив оценок',
+                'verbose_name_plural': 'Архив оценок',
+            },
+        ),
+        migrations.CreateModel(
+            name='RatingDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('likes', models.PositiveIntegerField(default=0, verbose_name='Лайков')),
+                ('dislikes', models.PositiveIntegerField(default=0, verbose_name='Дизлайков')),
+                ('voters', models.PositiveIntegerField(default=0, verbose_name='Проголосовавших')),
+                ('bucket', models.DateField(verbose_name='День')),
+            ],
+            options={
+                'verbose_name': 'Оценки за день',
+                'verbose_name_plural': 'Оценки по дням',
+                'ordering': ('bucket',),
+            },
+        ),
+        migrations.CreateModel(
+            name='RatingHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('likes', models.PositiveIntegerField(default=0, verbose_name='Лайков')),
+                ('dislikes', models.PositiveIntegerField(default=0, verbose_name='Дизлайков')),
+                ('voters', models.PositiveIntegerField(default=0, verbose_name='Проголосовавших')),
+                ('bucket', models.DateTimeField(verbose_name='Час (UTC)')),
+            ],
+            options={
+                'verbose_name': 'Оценки за час',
+                'verbose_name_plural': 'Оценки по часам',
+                'ordering': ('bucket',),
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='rating',
+            name='blog_rating_time_cr_95b965_idx',
+        ),
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['time_create'], name='blog_rating_time_cr_0b25d6_idx'),
+        ),
+        migrations.AddField(
+            model_name='ratingdaily',
+            name='post',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.post', verbose_name='Запись'),
+        ),
+        migrations.AddField(
+            model_name='ratinghourly',
+            name='post',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.post', verbose_name='Запись'),
+        ),
+        migrations.AddIndex(
+            model_name='ratingdaily',
+            index=models.Index(fields=['bucket'], name='blog_rating_bucket_a5c9f6_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='ratingdaily',
+            unique_together={('post', 'bucket')},
+        ),
+        migrations.AddIndex(
+            model_name='ratinghourly',
+            index=models.Index(fields=['bucket'], name='blog_rating_bucket_2ecdb1_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='ratinghourly',
+            unique_together={('post', 'bucket')},
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1 on 2026-10-19 01:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_tag_counts(apps, schema_editor):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Post = apps.get_model('blog', 'Post')
+    TaggedItem = apps.get_model('taggit', 'TaggedItem')
+    TagPostCount = apps.get_model('blog', 'TagPostCount')
+    content_type = ContentType.objects.filter(app_label='blog', model='post').first()
+    if content_type is None:
+        return
+    rows = (
+        TaggedItem.objects.filter(content_type=content_type,
+                                  object_id__in=Post.objects.filter(status='published').values('pk'))
+        .order_by().values('tag_id').annotate(total=Count('id'))
+    )
+    TagPostCount.objects.bulk_create(TagPostCount(tag_id=row['tag_id'], post_count=row['total']) for row in rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_rating_rollups'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagPostCount',
+            fields=[
+                ('tag', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='published_count', serialize=False, to='taggit.tag', verbose_name='Тег')),
+                ('post_count', models.IntegerField(default=0, verbose_name='Записей')),
+            ],
+            options={
+                'verbose_name': 'Записей с тегом',
+                'verbose_name_plural': 'Записей по тегам',
+                'ordering': ('-post_count',),
+                'indexes': [models.Index(fields=['-post_count'], name='blog_tagpos_post_co_dcf242_idx')],
+            },
+        ),
+        migrations.RunPython(fill_tag_counts, migrations.RunPython.noop),
+    ]
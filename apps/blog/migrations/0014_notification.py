@@ -0,0 +1,35 @@
+# Generated by Django 5.1 on 2026-10-19 01:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_comment_tree_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.PositiveSmallIntegerField(choices=[(1, 'Комментарий'), (2, 'Лайк'), (3, 'Дизлайк')], verbose_name='Событие')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Время события')),
+                ('is_read', models.BooleanField(default=False, verbose_name='Прочитано')),
+                ('is_sent', models.BooleanField(default=False, verbose_name='Отправлено')),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.post', verbose_name='Запись')),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL, verbose_name='Получатель')),
+            ],
+            options={
+                'verbose_name': 'Уведомление',
+                'verbose_name_plural': 'Уведомления',
+                'ordering': ('-id',),
+                'indexes': [models.Index(fields=['recipient', 'is_read'], name='blog_notifi_recipie_e62f77_idx'), models.Index(condition=models.Q(('is_sent', False)), fields=['id'], name='blog_notification_unsent_idx')],
+            },
+        ),
+    ]
@@ -1,14 +1,26 @@
-from django.db import models
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import MAXYEAR, MINYEAR, date, datetime
+
+from django.db import models, transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Sum, Window
+from django.db.models.functions import Coalesce, RowNumber, TruncMonth
+from django.utils import timezone
 from django.core.validators import FileExtensionValidator
 from django.contrib.auth.models import User
 
 from taggit.managers import TaggableManager
+from taggit.models import Tag
 
 from ckeditor.fields import RichTextField
 
 from django.urls import reverse
+from mptt.managers import TreeManager
 from mptt.models import MPTTModel, TreeForeignKey
-from apps.services.utils import unique_slugify
+from apps.services.fields import CompressedTextField
+from apps.services.objectcache import CachedObjectManager
+from apps.services.storage import content_storage, validate_upload_size
+from apps.services.utils import hash_ip_address, unique_slugify
 
 
 class PostManager(models.Manager):
@@ -24,6 +36,14 @@ class PostManager(models.Manager):
             'author', 'category').filter(status='published')
 
 
+class PostObjectManager(CachedObjectManager):
+    """
+    Менеджер записей с кешем объектов для страниц записи (вместе с автором, категорией и текстом)
+    """
+
+    cache_related = ('author', 'category', 'body')
+
+
 class Rating(models.Model):
     post = models.ForeignKey(to='Post', verbose_name='Запись',
                              on_delete=models.CASCADE,
@@ -39,13 +59,80 @@ class Rating(models.Model):
     class Meta:
         unique_together = ('post', 'ip_address')
         ordering = ('-time_create',)
-        indexes = [models.Index(fields=['-time_create', 'value'])]
+        indexes = [models.Index(fields=['time_create'])]
         verbose_name = 'Рейтинг'
         verbose_name_plural = 'Рейтинги'
 
     def __str__(self):
         return self.post.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Запоминаем загруженные значения для расчёта изменений в сигналах
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+
+class CommentManager(TreeManager):
+    """
+    Постраничная загрузка дерева комментариев: ветки и ответы по уровням,
+    не больше replies_limit прямых ответов на каждый комментарий
+    """
+
+    def with_replies(self, nodes, max_level, replies_limit):
+        """
+        Узлы nodes и ответы на них до уровня max_level по одному запросу на уровень:
+        прямые ответы нумеруются окном по parent_id и берутся первые replies_limit.
+        У комментария со скрытыми ответами replies_after - курсор для reply_page
+        """
+        result = list(nodes)
+        parents = [node for node in result if node.level < max_level and not node.is_leaf_node()]
+        while parents:
+            replies = self.filter(parent_id__in=[parent.pk for parent in parents]).annotate(
+                reply_number=Window(RowNumber(), partition_by=F('parent_id'), order_by=F('lft').asc()),
+            ).filter(reply_number__lte=replies_limit + 1).order_by()
+            shown, last_shown, more = [], {}, set()
+            for reply in replies:
+                if reply.reply_number > replies_limit:
+                    more.add(reply.parent_id)
+                    continue
+                shown.append(reply)
+                if reply.reply_number == replies_limit:
+                    last_shown[reply.parent_id] = reply.lft
+            for parent in parents:
+                if parent.pk in more:
+                    parent.replies_after = last_shown[parent.pk]
+            result += shown
+            parents = [node for node in shown if node.level < max_level and not node.is_leaf_node()]
+        result.sort(key=lambda node: (-node.tree_id, node.lft))
+        return result
+
+    def thread_page(self, post_id, depth, limit, replies_limit, after=None):
+        """
+        Страница веток записи: корневые комментарии по убыванию tree_id (после курсора after)
+        и их ответы до уровня depth; возвращает узлы в порядке обхода и курсор следующей страницы
+        """
+        roots = self.filter(post_id=post_id, level=0)
+        if after is not None:
+            roots = roots.filter(tree_id__lt=after)
+        roots = list(roots.order_by('-tree_id')[:limit + 1])
+        next_after = roots[limit - 1].tree_id if len(roots) > limit else None
+        return self.with_replies(roots[:limit], depth, replies_limit), next_after
+
+    def reply_page(self, parent, depth, limit, after=None):
+        """
+        Страница прямых ответов на комментарий (по lft после курсора after) вместе с их
+        ответами до уровня parent.level + depth
+        """
+        children = self.filter(tree_id=parent.tree_id, level=parent.level + 1,
+                               lft__gt=parent.lft if after is None else after, lft__lt=parent.rght)
+        children = list(children.order_by('lft')[:limit + 1])
+        next_after = children[limit - 1].lft if len(children) > limit else None
+        return self.with_replies(children[:limit], parent.level + depth, limit), next_after
+
 
 class Comment(MPTTModel):
     STATUS_OPTIONS = (
@@ -70,11 +157,19 @@ class Comment(MPTTModel):
                             null=True, blank=True, related_name='children',
                             on_delete=models.CASCADE)
 
+    objects = CommentManager()
+
     class MTTMeta:
         order_insertion_by = ('-time_create')
 
     class Meta:
         ordering = ['-time_create']
+        indexes = [
+            # Имена заданы явно: поля MPTT добавляются в модель после создания класса
+            models.Index(fields=['post', 'level', '-tree_id'], name='blog_comment_post_level_idx'),
+            models.Index(fields=['tree_id', 'lft'], name='blog_comment_tree_lft_idx'),
+            models.Index(fields=['parent', 'lft'], name='blog_comment_parent_lft_idx'),
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
@@ -92,14 +187,14 @@ class Post(models.Model):
     title = models.CharField(verbose_name='Название записи', max_length=255)
     slug = models.SlugField(verbose_name='URL', max_length=255, blank=True)
     description = RichTextField(config_name='awesome_ckeditor', verbose_name='Краткое описание', max_length=500)
-    text = RichTextField(config_name='awesome_ckeditor', verbose_name='Полный текст записи')
     category = TreeForeignKey('Category', on_delete=models.PROTECT, related_name='posts', verbose_name='Категория')
     thumbnail = models.ImageField(
         default='default.jpg',
         verbose_name='Изображение записи',
         blank=True,
         upload_to='images/thumbnails/%Y/%m/%d/',
-        validators=[FileExtensionValidator(allowed_extensions=('png', 'jpg', 'webp', 'jpeg', 'gif'))],
+        storage=content_storage,
+        validators=[FileExtensionValidator(allowed_extensions=('png', 'jpg', 'webp', 'jpeg', 'gif')), validate_upload_size],
     )
     status = models.CharField(choices=STATUS_OPTIONS, default='published', verbose_name='Статус записи', max_length=10)
     create = models.DateTimeField(
@@ -115,14 +210,17 @@ class Post(models.Model):
         to=User, verbose_name='Обновил', on_delete=models.SET_NULL, null=True, related_name='updater_posts', blank=True
     )
     fixed = models.BooleanField(verbose_name='Прикреплено', default=False)
-    objects = models.Manager()
+    objects = PostObjectManager()
     custom = PostManager()
     tags = TaggableManager()
 
     class Meta:
         db_table = 'blog_post'
         ordering = ['-fixed', '-create']
-        indexes = [models.Index(fields=['-fixed', '-create', 'status'])]
+        indexes = [
+            models.Index(fields=['-fixed', '-create', 'status']),
+            models.Index(fields=['status', 'create']),
+        ]
         verbose_name = 'Статья'
         verbose_name_plural = 'Статьи'
 
@@ -136,14 +234,67 @@ class Post(models.Model):
         return reverse('post_detail', kwargs={'slug': self.slug})
 
     def get_sum_rating(self):
-        return sum([rating.value for rating in self.ratings.all()])
+        return get_rating_sum(self.pk)
+
+    @property
+    def text(self):
+        """
+        Полный текст записи: загружается из PostBody только при обращении
+        """
+        if '_text' in self.__dict__:
+            return self._text
+        if self.pk is None:
+            return ''
+        try:
+            return self.body.text
+        except PostBody.DoesNotExist:
+            return ''
+
+    @text.setter
+    def text(self, value):
+        self._text = value
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Запоминаем загруженные значения для расчёта изменений в сигналах
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
 
     def save(self, *args, **kwargs):
         """
-        При сохранении генерируем слаг и проверяем на уникальность
+        При сохранении генерируем слаг и проверяем на уникальность,
+        изменённый полный текст записывается в PostBody
         """
         self.slug = unique_slugify(self, self.title, self.slug)
-        super().save(*args, **kwargs)
+        if '_text' not in self.__dict__:
+            super().save(*args, **kwargs)
+            return
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            body, created = PostBody.objects.update_or_create(post=self, defaults={'text': self._text})
+        self.body = body
+        del self._text
+
+
+class PostBody(models.Model):
+    """
+    Полный текст записи в отдельной таблице в сжатом виде: списки записей
+    читают только blog_post, текст загружается на странице записи
+    """
+
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True,
+                                related_name='body', verbose_name='Запись')
+    text = CompressedTextField(verbose_name='Полный текст записи')
+
+    class Meta:
+        verbose_name = 'Текст записи'
+        verbose_name_plural = 'Тексты записей'
+
+    def __str__(self):
+        return str(self.post_id)
 
 
 class Category(MPTTModel):
@@ -177,3 +328,388 @@ class Category(MPTTModel):
 
     def get_absolute_url(self):
         return reverse("post_by_category", kwargs={"slug": self.slug})
+
+
+class AuthorStatsManager(models.Manager):
+    """
+    Менеджер статистики авторов: инкрементальные изменения и пересчёт
+    """
+
+    def bump(self, user_id, last_activity=None, **deltas):
+        """
+        Атомарное изменение счётчиков автора одним UPDATE
+        """
+        if user_id is None:
+            return
+        values = {field: F(field) + delta for field, delta in deltas.items() if delta}
+        if last_activity is not None:
+            values['last_activity'] = last_activity
+        if not values:
+            return
+        if not self.filter(user_id=user_id).update(**values):
+            self.get_or_create(user_id=user_id)
+            self.filter(user_id=user_id).update(**values)
+
+    def rebuild(self, user_ids=None):
+        """
+        Полный пересчёт статистики (всех авторов или только переданных)
+        """
+        posts = Post.objects.filter(status='published')
+        ratings = Rating.objects.all()
+        archives = RatingArchive.objects.all()
+        comments = Comment.objects.all()
+        if user_ids is not None:
+            user_ids = [user_id for user_id in set(user_ids) if user_id is not None]
+            posts = posts.filter(author_id__in=user_ids)
+            ratings = ratings.filter(post__author_id__in=user_ids)
+            archives = archives.filter(post__author_id__in=user_ids)
+            comments = comments.filter(author_id__in=user_ids)
+
+        stats = defaultdict(dict)
+        for row in posts.order_by().values('author').annotate(total=Count('id'), last=Max('create')):
+            stats[row['author']].update(post_count=row['total'], last_activity=row['last'])
+        for row in ratings.order_by().values('post__author').annotate(total=Sum('value')):
+            stats[row['post__author']]['rating_total'] = row['total']
+        for row in archives.order_by().values('post__author').annotate(total=Sum(F('likes') - F('dislikes'))):
+            author_stats = stats[row['post__author']]
+            author_stats['rating_total'] = author_stats.get('rating_total', 0) + row['total']
+        for row in comments.order_by().values('author').annotate(total=Count('id'), last=Max('time_create')):
+            last_activity = stats[row['author']].get('last_activity')
+            stats[row['author']].update(
+                comment_count=row['total'],
+                last_activity=max(filter(None, (last_activity, row['last']))),
+            )
+
+        with transaction.atomic():
+            existing = self.all() if user_ids is None else self.filter(user_id__in=user_ids)
+            existing.delete()
+            self.bulk_create(self.model(user_id=user_id, **values) for user_id, values in stats.items())
+        return len(stats)
+
+
+class AuthorStats(models.Model):
+    """
+    Предрассчитанная статистика автора для профиля и рейтинга авторов
+    """
+
+    user = models.OneToOneField(User, verbose_name='Автор', on_delete=models.CASCADE,
+                                primary_key=True, related_name='author_stats')
+    post_count = models.IntegerField(verbose_name='Опубликовано записей', default=0)
+    rating_total = models.IntegerField(verbose_name='Рейтинг записей', default=0)
+    comment_count = models.IntegerField(verbose_name='Комментариев', default=0)
+    last_activity = models.DateTimeField(verbose_name='Последняя активность', null=True, blank=True)
+
+    objects = AuthorStatsManager()
+
+    class Meta:
+        ordering = ('-rating_total',)
+        indexes = [models.Index(fields=['-rating_total'])]
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return str(self.user)
+
+
+def get_month_range(year, month=None):
+    """
+    Границы месяца (или года) в текущем часовом поясе для фильтра по диапазону;
+    ValueError для несуществующего месяца и года вне MINYEAR..MAXYEAR (с запасом
+    на сдвиг часового пояса и конец диапазона)
+    """
+    if not MINYEAR < year < MAXYEAR or (month is not None and not 1 <= month <= 12):
+        raise ValueError(f'Некорректный период архива: {year}-{month}')
+    if month is None:
+        start, end = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+    else:
+        start = datetime(year, month, 1)
+        end = datetime(year + (month == 12), month % 12 + 1, 1)
+    return timezone.make_aware(start), timezone.make_aware(end)
+
+
+class PostArchiveMonthManager(models.Manager):
+    """
+    Менеджер помесячного архива: инкрементальные изменения и пересчёт
+    """
+
+    def bump(self, moment, delta):
+        """
+        Изменение счётчика месяца, в который попадает дата публикации
+        """
+        if not delta:
+            return
+        moment = timezone.localtime(moment)
+        month = self.filter(year=moment.year, month=moment.month)
+        if not month.update(post_count=F('post_count') + delta):
+            self.get_or_create(year=moment.year, month=moment.month)
+            month.update(post_count=F('post_count') + delta)
+
+    def rebuild(self, months=None):
+        """
+        Пересчёт счётчиков всех месяцев или только переданных пар (год, месяц)
+        """
+        posts = Post.objects.filter(status='published').order_by()
+        with transaction.atomic():
+            if months is None:
+                self.all().delete()
+                rows = posts.annotate(month=TruncMonth('create')).values('month').annotate(total=Count('id'))
+                self.bulk_create(
+                    self.model(year=row['month'].year, month=row['month'].month, post_count=row['total'])
+                    for row in rows
+                )
+                return
+            for year, month in set(months):
+                start, end = get_month_range(year, month)
+                self.update_or_create(
+                    year=year, month=month,
+                    defaults={'post_count': posts.filter(create__gte=start, create__lt=end).count()},
+                )
+
+
+class PostArchiveMonth(models.Model):
+    """
+    Предрассчитанное число опубликованных записей за месяц для виджета архива
+    """
+
+    year = models.PositiveSmallIntegerField(verbose_name='Год')
+    month = models.PositiveSmallIntegerField(verbose_name='Месяц')
+    post_count = models.IntegerField(verbose_name='Записей', default=0)
+
+    objects = PostArchiveMonthManager()
+
+    class Meta:
+        ordering = ('-year', '-month')
+        unique_together = ('year', 'month')
+        verbose_name = 'Месяц архива'
+        verbose_name_plural = 'Архив по месяцам'
+
+    def __str__(self):
+        return f'{self.month:02}.{self.year}'
+
+    @property
+    def date(self):
+        return date(self.year, self.month, 1)
+
+
+class TagPostCountManager(models.Manager):
+    """
+    Менеджер счётчиков опубликованных записей по тегам: инкрементальные изменения и пересчёт
+    """
+
+    def bump(self, tag_ids, delta):
+        """
+        Изменение счётчиков тегов одним UPDATE, недостающие строки создаются
+        """
+        tag_ids = set(tag_ids)
+        if not tag_ids or not delta:
+            return
+        counts = self.filter(tag_id__in=tag_ids)
+        if counts.update(post_count=F('post_count') + delta) < len(tag_ids):
+            missing = tag_ids.difference(counts.values_list('tag_id', flat=True))
+            for tag_id in missing:
+                self.get_or_create(tag_id=tag_id)
+            self.filter(tag_id__in=missing).update(post_count=F('post_count') + delta)
+
+    def rebuild(self, tag_ids=None):
+        """
+        Пересчёт счётчиков всех тегов или только переданных
+        """
+        tags = Tag.objects.all() if tag_ids is None else Tag.objects.filter(pk__in=set(tag_ids))
+        rows = tags.order_by().annotate(total=Count('post', filter=Q(post__status='published')))
+        with transaction.atomic():
+            existing = self.all() if tag_ids is None else self.filter(tag_id__in=set(tag_ids))
+            existing.delete()
+            self.bulk_create(self.model(tag_id=tag.pk, post_count=tag.total) for tag in rows)
+
+
+class TagPostCount(models.Model):
+    """
+    Предрассчитанное число опубликованных записей с тегом для облака тегов и пагинации
+    """
+
+    tag = models.OneToOneField(Tag, verbose_name='Тег', on_delete=models.CASCADE,
+                               primary_key=True, related_name='published_count')
+    post_count = models.IntegerField(verbose_name='Записей', default=0)
+
+    objects = TagPostCountManager()
+
+    class Meta:
+        ordering = ('-post_count',)
+        indexes = [models.Index(fields=['-post_count'])]
+        verbose_name = 'Записей с тегом'
+        verbose_name_plural = 'Записей по тегам'
+
+    def __str__(self):
+        return f'{self.tag_id}: {self.post_count}'
+
+
+class RatingRollupManager(models.Manager):
+    """
+    Менеджер свёрток оценок
+    """
+
+    def bump(self, post_id, bucket, **deltas):
+        """
+        Поправка уже свёрнутого интервала одним UPDATE (изменение или удаление старого голоса)
+        """
+        values = {field: F(field) + delta for field, delta in deltas.items() if delta}
+        if values:
+            self.filter(post_id=post_id, bucket=bucket).update(**values)
+
+    def add(self, post_id, bucket, **values):
+        """
+        Добавление новых голосов к интервалу, строка создаётся при первом обращении
+        """
+        rollup = self.filter(post_id=post_id, bucket=bucket)
+        if not rollup.update(**{field: F(field) + value for field, value in values.items()}):
+            self.create(post_id=post_id, bucket=bucket, **values)
+
+
+class RatingRollup(models.Model):
+    """
+    Свёртка оценок записи за интервал: лайки, дизлайки и число проголосовавших
+    """
+
+    post = models.ForeignKey(Post, verbose_name='Запись', on_delete=models.CASCADE, related_name='+')
+    likes = models.PositiveIntegerField(verbose_name='Лайков', default=0)
+    dislikes = models.PositiveIntegerField(verbose_name='Дизлайков', default=0)
+    voters = models.PositiveIntegerField(verbose_name='Проголосовавших', default=0)
+
+    objects = RatingRollupManager()
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f'{self.post_id}: {self.bucket}'
+
+
+class RatingHourly(RatingRollup):
+    bucket = models.DateTimeField(verbose_name='Час (UTC)')
+
+    class Meta:
+        ordering = ('bucket',)
+        unique_together = ('post', 'bucket')
+        indexes = [models.Index(fields=['bucket'])]
+        verbose_name = 'Оценки за час'
+        verbose_name_plural = 'Оценки по часам'
+
+
+class RatingDaily(RatingRollup):
+    bucket = models.DateField(verbose_name='День')
+
+    class Meta:
+        ordering = ('bucket',)
+        unique_together = ('post', 'bucket')
+        indexes = [models.Index(fields=['bucket'])]
+        verbose_name = 'Оценки за день'
+        verbose_name_plural = 'Оценки по дням'
+
+
+class RatingArchiveManager(models.Manager):
+
+    def has_voted(self, post_id, ip_address):
+        """
+        Голосовал ли адрес за запись до сворачивания старых голосов
+        """
+        archive = self.filter(post_id=post_id).only('voters').first()
+        return archive is not None and archive.has_voter(hash_ip_address(ip_address, RatingArchive.HASH_SIZE))
+
+
+class RatingArchive(models.Model):
+    """
+    Свёрнутые старые голоса записи: суммы и отсортированный массив коротких
+    хешей IP-адресов (8 байт на голос) для защиты от повторного голосования
+    """
+
+    HASH_SIZE = 8
+
+    post = models.OneToOneField(Post, verbose_name='Запись', on_delete=models.CASCADE,
+                                primary_key=True, related_name='rating_archive')
+    likes = models.PositiveIntegerField(verbose_name='Лайков', default=0)
+    dislikes = models.PositiveIntegerField(verbose_name='Дизлайков', default=0)
+    voters = models.BinaryField(verbose_name='Хеши IP-адресов', default=b'')
+
+    objects = RatingArchiveManager()
+
+    class Meta:
+        verbose_name = 'Архив оценок'
+        verbose_name_plural = 'Архив оценок'
+
+    def __str__(self):
+        return str(self.post_id)
+
+    @property
+    def voter_count(self):
+        return len(self.voters) // self.HASH_SIZE
+
+    def get_hash(self, index):
+        return bytes(self.voters[index * self.HASH_SIZE:(index + 1) * self.HASH_SIZE])
+
+    def has_voter(self, ip_hash):
+        """
+        Двоичный поиск хеша прямо в массиве байтов, без распаковки
+        """
+        index = bisect_left(range(self.voter_count), ip_hash, key=self.get_hash)
+        return index < self.voter_count and self.get_hash(index) == ip_hash
+
+    def add_voters(self, ip_hashes):
+        hashes = {self.get_hash(index) for index in range(self.voter_count)}
+        hashes.update(ip_hashes)
+        self.voters = b''.join(sorted(hashes))
+
+
+def get_rating_sum(post_id):
+    """
+    Сумма оценок записи одним запросом: текущие голоса и свёрнутые в архив
+    """
+    current = (
+        Rating.objects.filter(post_id=OuterRef('pk')).order_by()
+        .values('post_id').annotate(total=Sum('value')).values('total')
+    )
+    archived = RatingArchive.objects.filter(post_id=OuterRef('pk')).values(total=F('likes') - F('dislikes'))
+    rating_sum = (
+        Post.objects.filter(pk=post_id)
+        .annotate(rating_sum=Coalesce(Subquery(current), 0) + Coalesce(Subquery(archived), 0))
+        .values_list('rating_sum', flat=True).first()
+    )
+    return rating_sum or 0
+
+
+class Notification(models.Model):
+    """
+    Уведомление автора о комментарии или оценке его записи: очередь на отправку
+    дайджестом (is_sent) и список непрочитанных на сайте (is_read)
+    """
+
+    COMMENT = 1
+    LIKE = 2
+    DISLIKE = 3
+    KIND_OPTIONS = (
+        (COMMENT, 'Комментарий'),
+        (LIKE, 'Лайк'),
+        (DISLIKE, 'Дизлайк'),
+    )
+
+    recipient = models.ForeignKey(User, verbose_name='Получатель', on_delete=models.CASCADE,
+                                  related_name='notifications')
+    post = models.ForeignKey('Post', verbose_name='Запись', on_delete=models.CASCADE, related_name='+')
+    actor = models.ForeignKey(User, verbose_name='Пользователь', on_delete=models.SET_NULL,
+                              null=True, blank=True, related_name='+')
+    kind = models.PositiveSmallIntegerField(verbose_name='Событие', choices=KIND_OPTIONS)
+    created = models.DateTimeField(verbose_name='Время события', auto_now_add=True)
+    is_read = models.BooleanField(verbose_name='Прочитано', default=False)
+    is_sent = models.BooleanField(verbose_name='Отправлено', default=False)
+
+    class Meta:
+        ordering = ('-id',)
+        indexes = [
+            models.Index(fields=['recipient', 'is_read']),
+            # Очередь дайджеста: частичный индекс только по неотправленным
+            models.Index(fields=['id'], condition=Q(is_sent=False), name='blog_notification_unsent_idx'),
+        ]
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+
+    def __str__(self):
+        return f'{self.get_kind_display()}: {self.post_id} -> {self.recipient_id}'
@@ -0,0 +1,186 @@
+import json
+import os
+from collections import defaultdict
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.mail import send_mass_mail
+from django.db import transaction
+from django.db.models import Count, Max
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Notification, Post
+
+
+DIGEST_SUBJECT = 'Новые комментарии и оценки ваших записей'
+
+
+def get_unread_timeout():
+    return getattr(settings, 'NOTIFICATION_UNREAD_TIMEOUT', 24 * 60 * 60)
+
+
+def get_retention_days():
+    return getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 30)
+
+
+def unread_cache_key(user_id):
+    return f'notifications-unread-{user_id}'
+
+
+def get_spool_path():
+    return Path(getattr(settings, 'NOTIFICATION_SPOOL', settings.BASE_DIR / 'notifications.spool'))
+
+
+def get_processing_path():
+    spool = get_spool_path()
+    return spool.with_name(f'{spool.name}.processing')
+
+
+def append_event(*event):
+    """
+    Событие в спул уведомлений после фиксации транзакции: запросов к базе
+    в обработке запроса нет, спул разбирает ежечасная отправка дайджестов
+    """
+    def append():
+        spool = get_spool_path()
+        spool.parent.mkdir(parents=True, exist_ok=True)
+        # Короткие дописывания в режиме O_APPEND не перемешиваются между процессами
+        with open(spool, 'a', encoding='utf-8') as spool_file:
+            spool_file.write(f'{json.dumps(event)}\n')
+
+    transaction.on_commit(append)
+
+
+def notify(kind, post_id, actor_id=None, key=None):
+    """
+    Уведомление автора записи о событии; key - идентификатор события
+    (например, оценки), по которому его можно отменить через withdraw
+    """
+    # post_id оценки из формы может прийти строкой
+    append_event('notify', key, kind, int(post_id), actor_id)
+
+
+def withdraw(key):
+    """
+    Отмена события (оценку сняли): ещё не разобранное уведомление с тем же key
+    не будет создано, чтобы лайк-отмена-лайк не давал повторных уведомлений
+    """
+    append_event('withdraw', key)
+
+
+def take_events():
+    """
+    Забрать накопленные события: спул переименовывается, новые копятся в новом файле
+    """
+    spool, processing = get_spool_path(), get_processing_path()
+    if not processing.exists():
+        if not spool.exists():
+            return []
+        os.replace(spool, processing)
+    return [json.loads(line) for line in processing.read_text(encoding='utf-8').splitlines() if line]
+
+
+def fold_events():
+    """
+    Разбор спула в таблицу уведомлений: отменённые события отбрасываются,
+    получатели (авторы записей) определяются одним запросом, уведомления
+    добавляются одной вставкой, счётчики непрочитанных у получателей сбрасываются.
+    О своих действиях автор не уведомляется
+    """
+    pending = {}
+    for number, (action, key, *event) in enumerate(take_events()):
+        if action == 'withdraw':
+            pending.pop(key, None)
+        else:
+            pending[number if key is None else key] = event
+    authors = dict(Post.objects.filter(pk__in={post_id for kind, post_id, actor_id in pending.values()})
+                   .values_list('id', 'author_id'))
+    actor_ids = {actor_id for kind, post_id, actor_id in pending.values() if actor_id is not None}
+    actor_ids = set(User.objects.filter(pk__in=actor_ids).values_list('id', flat=True))
+    notifications = [
+        # Действовавшего пользователя могли удалить до разбора спула
+        Notification(recipient_id=authors[post_id], post_id=post_id, kind=kind,
+                     actor_id=actor_id if actor_id in actor_ids else None)
+        for kind, post_id, actor_id in pending.values()
+        if post_id in authors and authors[post_id] != actor_id
+    ]
+    Notification.objects.bulk_create(notifications)
+    processing = get_processing_path()
+    if processing.exists():
+        processing.unlink()
+    cache.delete_many([unread_cache_key(user_id) for user_id in {item.recipient_id for item in notifications}])
+    return len(notifications)
+
+
+def get_unread_count(user_id):
+    """
+    Число непрочитанных уведомлений: из кеша, запрос только при его отсутствии
+    """
+    key = unread_cache_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+        cache.set(key, count, get_unread_timeout())
+    return count
+
+
+def mark_read(user_id):
+    Notification.objects.filter(recipient_id=user_id, is_read=False).update(is_read=True)
+    cache.set(unread_cache_key(user_id), 0, get_unread_timeout())
+
+
+def send_digests():
+    """
+    Дайджесты по получателям: неотправленные уведомления группируются одним запросом
+    по записи и событию, письма уходят через одно соединение с почтовым сервером,
+    затем обработанные уведомления отмечаются отправленными. Уведомления,
+    добавленные во время отправки, попадут в следующий дайджест
+    """
+    last_id = Notification.objects.filter(is_sent=False).aggregate(last=Max('id'))['last']
+    if last_id is None:
+        return 0
+    pending = Notification.objects.filter(is_sent=False, id__lte=last_id)
+    digests = defaultdict(lambda: defaultdict(dict))
+    rows = pending.order_by().values_list('recipient_id', 'post_id', 'kind').annotate(total=Count('id'))
+    for recipient_id, post_id, kind, total in rows:
+        digests[recipient_id][post_id][kind] = total
+
+    post_ids = {post_id for posts in digests.values() for post_id in posts}
+    posts = Post.objects.only('title', 'slug').in_bulk(post_ids)
+    recipients = User.objects.filter(pk__in=digests).exclude(email='').values_list('id', 'username', 'email')
+    messages = []
+    for user_id, username, email in recipients:
+        items = [
+            {
+                'post': posts[post_id],
+                'comments': kinds.get(Notification.COMMENT, 0),
+                'likes': kinds.get(Notification.LIKE, 0),
+                'dislikes': kinds.get(Notification.DISLIKE, 0),
+            }
+            for post_id, kinds in digests[user_id].items() if post_id in posts
+        ]
+        if items:
+            body = render_to_string('blog/email/notification_digest.txt', {
+                'username': username, 'items': items, 'site_url': settings.SITE_URL,
+            })
+            messages.append((DIGEST_SUBJECT, body, None, [email]))
+    sent = send_mass_mail(messages) if messages else 0
+    pending.update(is_sent=True)
+    return sent
+
+
+def purge_notifications(now=None):
+    """
+    Удаление отправленных уведомлений старше срока хранения, прочитанных или нет;
+    счётчики непрочитанных у получателей удалённых непрочитанных сбрасываются
+    """
+    deadline = (now or timezone.now()) - timedelta(days=get_retention_days())
+    expired = Notification.objects.filter(is_sent=True, created__lt=deadline)
+    recipient_ids = set(expired.filter(is_read=False).order_by().values_list('recipient_id', flat=True).distinct())
+    deleted, _ = expired.delete()
+    cache.delete_many([unread_cache_key(user_id) for user_id in recipient_ids])
+    return deleted
@@ -0,0 +1,191 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from apps.services.utils import hash_ip_address
+
+from .models import Rating, RatingArchive, RatingDaily, RatingHourly
+
+
+# Удаление голосов при переносе в архив: сигналы удаления оценки не меняют свёртки и статистику
+compacting = ContextVar('compacting_ratings', default=False)
+
+# Голос, записанный в конце часа, может зафиксироваться чуть позже начала следующего
+ROLLUP_GRACE = timedelta(minutes=5)
+
+CHART_PERIODS = {
+    'hour': (RatingHourly, timedelta(hours=48)),
+    'day': (RatingDaily, timedelta(days=90)),
+}
+
+
+def get_retention_days():
+    return getattr(settings, 'RATING_RETENTION_DAYS', 90)
+
+
+def get_hourly_retention_days():
+    return getattr(settings, 'RATING_HOURLY_RETENTION_DAYS', 30)
+
+
+def hour_bucket(moment):
+    return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def day_bucket(moment):
+    return timezone.localdate(moment)
+
+
+def get_rolled_up_until():
+    """
+    Граница свёрнутых голосов: конец последнего часа в почасовой таблице,
+    а если почасовые данные уже очищены - конец последнего дня в дневной
+    """
+    last_hour = RatingHourly.objects.aggregate(last=Max('bucket'))['last']
+    if last_hour is not None:
+        return last_hour + timedelta(hours=1)
+    last_day = RatingDaily.objects.aggregate(last=Max('bucket'))['last']
+    if last_day is not None:
+        return timezone.make_aware(datetime.combine(last_day + timedelta(days=1), time()))
+    return None
+
+
+def roll_up_ratings(now=None):
+    """
+    Инкрементальная свёртка: голоса завершившихся часов после границы свёрнутого
+    добавляются в почасовую и дневную таблицы
+    """
+    end = hour_bucket((now or timezone.now()) - ROLLUP_GRACE)
+    start = get_rolled_up_until()
+    if start is None:
+        first = Rating.objects.aggregate(first=Min('time_create'))['first']
+        if first is None:
+            return 0
+        start = hour_bucket(first)
+    if start >= end:
+        return 0
+
+    rows = (
+        Rating.objects.filter(time_create__gte=start, time_create__lt=end).order_by()
+        .annotate(bucket=TruncHour('time_create', tzinfo=dt_timezone.utc))
+        .values('post_id', 'bucket')
+        .annotate(likes=Count('id', filter=Q(value=1)), dislikes=Count('id', filter=Q(value=-1)),
+                  voters=Count('ip_address', distinct=True))
+    )
+    hourly = [RatingHourly(**row) for row in rows]
+    daily = defaultdict(lambda: {'likes': 0, 'dislikes': 0, 'voters': 0})
+    for rollup in hourly:
+        totals = daily[rollup.post_id, day_bucket(rollup.bucket)]
+        totals['likes'] += rollup.likes
+        totals['dislikes'] += rollup.dislikes
+        totals['voters'] += rollup.voters
+
+    with transaction.atomic():
+        RatingHourly.objects.bulk_create(hourly, batch_size=500)
+        for (post_id, day), totals in daily.items():
+            RatingDaily.objects.add(post_id, day, **totals)
+    return len(hourly)
+
+
+def apply_vote_change(post_id, time_create, likes=0, dislikes=0, voters=0, rolled_up_until=None):
+    """
+    Поправка свёрток при изменении или удалении голоса из уже свёрнутого часа;
+    голоса несвёрнутых часов попадут в свёртку как есть
+    """
+    rolled_up_until = rolled_up_until or get_rolled_up_until()
+    if rolled_up_until is None or time_create >= rolled_up_until:
+        return
+    deltas = {'likes': likes, 'dislikes': dislikes, 'voters': voters}
+    RatingHourly.objects.bump(post_id, hour_bucket(time_create), **deltas)
+    RatingDaily.objects.bump(post_id, day_bucket(time_create), **deltas)
+
+
+def remove_votes(ratings):
+    """
+    Поправка свёрток перед массовым удалением голосов без сигналов
+    """
+    rolled_up_until = get_rolled_up_until()
+    if rolled_up_until is None:
+        return
+    rows = (
+        ratings.filter(time_create__lt=rolled_up_until).order_by()
+        .annotate(bucket=TruncHour('time_create', tzinfo=dt_timezone.utc))
+        .values('post_id', 'bucket')
+        .annotate(likes=Count('id', filter=Q(value=1)), dislikes=Count('id', filter=Q(value=-1)),
+                  voters=Count('id'))
+    )
+    for row in rows:
+        apply_vote_change(row['post_id'], row['bucket'], likes=-row['likes'], dislikes=-row['dislikes'],
+                          voters=-row['voters'], rolled_up_until=rolled_up_until)
+
+
+@contextmanager
+def compacting_ratings():
+    token = compacting.set(True)
+    try:
+        yield
+    finally:
+        compacting.reset(token)
+
+
+def is_compacting():
+    return compacting.get()
+
+
+def compact_ratings(now=None):
+    """
+    Голоса старше RATING_RETENTION_DAYS переносятся в архив записи: суммы
+    и хеши IP-адресов, строки голосов удаляются. Свёртки, сумма рейтинга
+    и статистика авторов не меняются, поэтому обработчики сигналов удаления
+    оценки при переносе ничего не делают
+    """
+    rolled_up_until = get_rolled_up_until()
+    if rolled_up_until is None:
+        return 0
+    cutoff = (now or timezone.now()) - timedelta(days=get_retention_days())
+    old = Rating.objects.filter(time_create__lt=min(cutoff, rolled_up_until))
+    compacted = 0
+    for post_id in old.order_by().values_list('post_id', flat=True).distinct():
+        votes = old.filter(post_id=post_id)
+        with transaction.atomic(), compacting_ratings():
+            rows = list(votes.values_list('ip_address', 'value'))
+            archive, created = RatingArchive.objects.select_for_update().get_or_create(post_id=post_id)
+            archive.add_voters(hash_ip_address(ip_address, RatingArchive.HASH_SIZE) for ip_address, value in rows)
+            archive.likes += sum(1 for _, value in rows if value == 1)
+            archive.dislikes += sum(1 for _, value in rows if value == -1)
+            archive.save()
+            deleted, _ = votes.delete()
+            compacted += deleted
+    return compacted
+
+
+def prune_hourly_rollups(now=None):
+    """
+    Почасовые свёртки нужны только для недавних графиков, дневные хранятся всегда
+    """
+    cutoff = (now or timezone.now()) - timedelta(days=get_hourly_retention_days())
+    deleted, _ = RatingHourly.objects.filter(bucket__lt=hour_bucket(cutoff)).delete()
+    return deleted
+
+
+def get_rating_chart(post, period='day', now=None):
+    """
+    Ряд свёрток записи за последние 48 часов или 90 дней
+    """
+    model, length = CHART_PERIODS[period]
+    since = (now or timezone.now()) - length
+    since = hour_bucket(since) if period == 'hour' else day_bucket(since)
+    rows = list(model.objects.filter(post=post, bucket__gte=since).values('bucket', 'likes', 'dislikes', 'voters'))
+    return {
+        'rows': rows,
+        'max': max((max(row['likes'], row['dislikes']) for row in rows), default=0),
+        'likes': sum(row['likes'] for row in rows),
+        'dislikes': sum(row['dislikes'] for row in rows),
+        'voters': sum(row['voters'] for row in rows),
+    }
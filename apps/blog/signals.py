@@ -0,0 +1,380 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.contrib.auth.models import User
+from django.dispatch import receiver
+from django.urls import reverse
+
+from taggit.models import Tag
+
+from apps.accounts.models import Profile
+from apps.services.cache import invalidate_layout
+from apps.services.pubsub import broker
+
+from .models import (Post, Category, Comment, Rating, AuthorStats, PostArchiveMonth, TagPostCount, Notification,
+                     get_rating_sum)
+from .api import serialize_comment
+from .autocomplete import autocomplete_index, post_entry, profile_entry, tag_entry
+from .notifications import notify, withdraw
+from .rollups import apply_vote_change, is_compacting
+from .sitemaps import invalidate_sitemap_chunk
+from .snapshot import FULL_REBUILD, get_post_paths, is_snapshot_enabled, mark_dirty
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_sidebar(sender, instance, **kwargs):
+    """
+    Сброс кеша боковой панели при изменении дерева категорий
+    """
+    invalidate_layout('sidebar')
+
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_cached_post(sender, instance, **kwargs):
+    Post.objects.invalidate(instance.pk, slugs=[instance.slug])
+
+
+@receiver(post_save, sender=Category)
+def invalidate_cached_posts_on_category_save(sender, instance, **kwargs):
+    """
+    Закешированные записи хранят категорию вместе с записью
+    """
+    Post.objects.invalidate(*Post.objects.filter(category=instance).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_posts_on_user_save(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and set(update_fields) == {'last_login'}):
+        return
+    Post.objects.invalidate(*Post.objects.filter(author=instance).values_list('pk', flat=True))
+
+
+SITEMAP_SECTION_BY_MODEL = {
+    Post: 'posts',
+    Category: 'categories',
+    Tag: 'tags',
+    Profile: 'profiles',
+}
+
+
+def invalidate_sitemap(sender, instance, **kwargs):
+    """
+    Сброс части карты сайта, содержащей изменённый объект
+    """
+    invalidate_sitemap_chunk(SITEMAP_SECTION_BY_MODEL[sender], instance.pk)
+
+
+# Подключение только к моделям карты сайта: обработчик удаления без sender
+# отключил бы быстрое удаление (без загрузки строк) у всех моделей
+for model in SITEMAP_SECTION_BY_MODEL:
+    post_save.connect(invalidate_sitemap, sender=model)
+    post_delete.connect(invalidate_sitemap, sender=model)
+
+
+def get_post_author_id(rating):
+    """
+    Автор записи, к которой относится оценка
+    """
+    if Rating.post.is_cached(rating):
+        return rating.post.author_id
+    if not hasattr(rating, '_post_author_id'):
+        # Запоминается на оценке: нужен и статистике, и уведомлениям
+        rating._post_author_id = Post.objects.filter(pk=rating.post_id).values_list('author_id', flat=True).first()
+    return rating._post_author_id
+
+
+@receiver(post_save, sender=Post)
+def mark_snapshot_on_post_save(sender, instance, created, **kwargs):
+    """
+    Страницы статического снимка, затронутые записью (до сброса _loaded_values).
+    Публикация меняет только списки, где запись появляется; счётчики архива и тегов
+    в боковой панели остальных страниц обновит ночная полная публикация
+    """
+    if not is_snapshot_enabled() or (created and instance.status != 'published'):
+        return
+    loaded = {} if created else getattr(instance, '_loaded_values', {})
+    paths = get_post_paths([instance.pk])
+    if loaded.get('slug', instance.slug) != instance.slug:
+        paths.add(reverse('post_detail', args=[loaded['slug']]))
+    if loaded.get('category_id', instance.category_id) != instance.category_id:
+        paths.update(reverse('post_by_category', args=[slug])
+                     for slug in Category.objects.filter(pk=loaded['category_id']).values_list('slug', flat=True))
+    mark_dirty(*paths)
+
+
+@receiver(post_save, sender=Post)
+def update_counters_on_post_save(sender, instance, created, **kwargs):
+    """
+    Изменение счётчиков автора и архива при создании и смене статуса записи
+    """
+    is_published = instance.status == 'published'
+    loaded = {} if created else getattr(instance, '_loaded_values', {})
+    old_author_id = loaded.get('author_id', instance.author_id)
+    was_published = not created and loaded.get('status', instance.status) == 'published'
+    delta = int(is_published) - int(was_published)
+
+    if created:
+        AuthorStats.objects.bump(instance.author_id, last_activity=instance.create, post_count=delta)
+    elif old_author_id != instance.author_id:
+        AuthorStats.objects.rebuild(user_ids=[old_author_id, instance.author_id])
+    else:
+        AuthorStats.objects.bump(instance.author_id, post_count=delta)
+
+    if delta:
+        PostArchiveMonth.objects.bump(instance.create, delta)
+        if not created:
+            TagPostCount.objects.bump(instance.tags.values_list('pk', flat=True), delta)
+        invalidate_layout('sidebar')
+    instance._loaded_values = {'author_id': instance.author_id, 'status': instance.status}
+
+
+@receiver(pre_delete, sender=Post)
+def remember_tags_on_post_delete(sender, instance, **kwargs):
+    """
+    Связи с тегами удаляются раньше самой записи, поэтому теги запоминаются заранее
+    """
+    if instance.status == 'published':
+        instance._tag_ids = list(instance.tags.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Post)
+def update_counters_on_post_delete(sender, instance, **kwargs):
+    if instance.status == 'published':
+        AuthorStats.objects.bump(instance.author_id, post_count=-1)
+        PostArchiveMonth.objects.bump(instance.create, -1)
+        TagPostCount.objects.bump(getattr(instance, '_tag_ids', ()), -1)
+        invalidate_layout('sidebar')
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def update_tag_counts_on_tags_change(sender, instance, action, pk_set, **kwargs):
+    """
+    Счётчики тегов опубликованной записи при добавлении, удалении и очистке тегов
+    """
+    if not isinstance(instance, Post) or instance.status != 'published':
+        return
+    if action == 'pre_clear':
+        instance._cleared_tag_ids = list(instance.tags.values_list('pk', flat=True))
+        return
+    if action == 'post_clear':
+        tag_ids, delta = getattr(instance, '_cleared_tag_ids', ()), -1
+    elif action in ('post_add', 'post_remove'):
+        tag_ids, delta = pk_set or (), 1 if action == 'post_add' else -1
+    else:
+        return
+    if tag_ids:
+        TagPostCount.objects.bump(tag_ids, delta)
+        invalidate_layout('sidebar')
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def invalidate_sidebar_on_tag_change(sender, instance, **kwargs):
+    """
+    Облако тегов в боковой панели показывает названия тегов
+    """
+    invalidate_layout('sidebar')
+
+
+@receiver(post_save, sender=Rating)
+def update_rollups_on_rating_save(sender, instance, created, **kwargs):
+    """
+    Смена значения старого голоса поправляет уже свёрнутые интервалы
+    """
+    old_value = getattr(instance, '_loaded_values', {}).get('value', instance.value)
+    if created or old_value == instance.value:
+        return
+    apply_vote_change(instance.post_id, instance.time_create,
+                      likes=(instance.value == 1) - (old_value == 1),
+                      dislikes=(instance.value == -1) - (old_value == -1))
+
+
+@receiver(post_delete, sender=Rating)
+def update_rollups_on_rating_delete(sender, instance, **kwargs):
+    if is_compacting():
+        return
+    apply_vote_change(instance.post_id, instance.time_create,
+                      likes=-(instance.value == 1), dislikes=-(instance.value == -1), voters=-1)
+
+
+@receiver(post_save, sender=Rating)
+def update_stats_on_rating_save(sender, instance, created, **kwargs):
+    """
+    Изменение суммарного рейтинга автора записи
+    """
+    old_value = 0 if created else getattr(instance, '_loaded_values', {}).get('value', instance.value)
+    AuthorStats.objects.bump(get_post_author_id(instance), rating_total=instance.value - old_value)
+    instance._loaded_values = {'value': instance.value}
+
+
+@receiver(post_delete, sender=Rating)
+def update_stats_on_rating_delete(sender, instance, **kwargs):
+    if is_compacting():
+        return
+    AuthorStats.objects.bump(get_post_author_id(instance), rating_total=-instance.value)
+
+
+@receiver(post_save, sender=Comment)
+def update_stats_on_comment_save(sender, instance, created, **kwargs):
+    if created:
+        AuthorStats.objects.bump(instance.author_id, last_activity=instance.time_create, comment_count=1)
+
+
+@receiver(post_delete, sender=Comment)
+def update_stats_on_comment_delete(sender, instance, **kwargs):
+    AuthorStats.objects.bump(instance.author_id, comment_count=-1)
+
+
+@receiver(post_save, sender=Comment)
+def notify_on_comment(sender, instance, created, **kwargs):
+    if created:
+        notify(Notification.COMMENT, instance.post_id, actor_id=instance.author_id, key=f'comment-{instance.pk}')
+
+
+@receiver(post_save, sender=Rating)
+def notify_on_rating(sender, instance, created, **kwargs):
+    """
+    Уведомление о новой оценке; ключ события - сама оценка, чтобы снятие
+    отменяло именно её, в том числе у анонимных голосов
+    """
+    if created:
+        kind = Notification.LIKE if instance.value == 1 else Notification.DISLIKE
+        notify(kind, instance.post_id, actor_id=instance.user_id, key=f'rating-{instance.pk}')
+
+
+@receiver(post_delete, sender=Rating)
+def withdraw_rating_notification(sender, instance, **kwargs):
+    """
+    Снятая оценка убирает ещё не отправленное уведомление о ней
+    """
+    if is_compacting():
+        return
+    withdraw(f'rating-{instance.pk}')
+
+
+def post_channel(post_id):
+    """
+    Канал событий записи для потока /post/<pk>/events/
+    """
+    return f'post-{post_id}'
+
+
+@receiver(post_save, sender=Comment)
+def publish_comment(sender, instance, created, **kwargs):
+    """
+    Новый комментарий читателям записи (после фиксации транзакции)
+    """
+    if created:
+        transaction.on_commit(
+            lambda: broker.publish(post_channel(instance.post_id), 'comment', serialize_comment(instance))
+        )
+
+
+@receiver([post_save, post_delete], sender=Rating)
+def publish_rating_sum(sender, instance, **kwargs):
+    """
+    Новая сумма рейтинга записи читателям записи
+    """
+    if is_compacting():
+        # Перенос в архив не меняет сумму рейтинга
+        return
+
+    def publish():
+        broker.publish(post_channel(instance.post_id), 'rating',
+                       {'post_id': instance.post_id, 'rating_sum': get_rating_sum(instance.post_id)})
+
+    transaction.on_commit(publish)
+
+
+@receiver(post_delete, sender=Post)
+def mark_snapshot_on_post_delete(sender, instance, **kwargs):
+    if not is_snapshot_enabled():
+        return
+    if instance.status == 'published':
+        mark_dirty(FULL_REBUILD)
+    else:
+        mark_dirty(reverse('post_detail', args=[instance.slug]))
+
+
+@receiver([post_save, post_delete], sender=Category)
+def mark_snapshot_on_category_change(sender, instance, **kwargs):
+    """
+    Дерево категорий выводится в боковой панели каждой страницы
+    """
+    if is_snapshot_enabled():
+        mark_dirty(FULL_REBUILD)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def mark_snapshot_on_tags_change(sender, instance, action, pk_set, **kwargs):
+    """
+    Запись и страницы добавленных или снятых тегов; облако тегов в боковой
+    панели остальных страниц обновит ночная полная публикация
+    """
+    if not is_snapshot_enabled() or action not in ('post_add', 'post_remove') or not isinstance(instance, Post):
+        return
+    tags = Tag.objects.filter(pk__in=pk_set).values_list('slug', flat=True)
+    mark_dirty(reverse('post_detail', args=[instance.slug]),
+               *(reverse('post_by_tags', args=[slug]) for slug in tags))
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def mark_snapshot_on_comment_change(sender, instance, **kwargs):
+    if not is_snapshot_enabled():
+        return
+    slugs = Post.objects.filter(pk=instance.post_id).values_list('slug', flat=True)
+    mark_dirty(*(reverse('post_detail', args=[slug]) for slug in slugs))
+
+
+@receiver([post_save, post_delete], sender=Rating)
+def mark_snapshot_on_rating_change(sender, instance, **kwargs):
+    """
+    Сумма рейтинга выводится на странице записи и в списках
+    """
+    if is_snapshot_enabled() and not is_compacting():
+        mark_dirty(*get_post_paths([instance.post_id]))
+
+
+@receiver(post_save, sender=Post)
+def update_autocomplete_on_post_save(sender, instance, **kwargs):
+    """
+    В подсказках только опубликованные записи
+    """
+    if instance.status == 'published':
+        entry = post_entry(instance.pk, instance.title, instance.slug)
+        transaction.on_commit(lambda: autocomplete_index.put(*entry))
+    else:
+        transaction.on_commit(lambda: autocomplete_index.remove(('post', instance.pk)))
+
+
+@receiver(post_save, sender=Tag)
+def update_autocomplete_on_tag_save(sender, instance, **kwargs):
+    entry = tag_entry(instance.pk, instance.name, instance.slug)
+    transaction.on_commit(lambda: autocomplete_index.put(*entry))
+
+
+@receiver(post_save, sender=Profile)
+def update_autocomplete_on_profile_save(sender, instance, **kwargs):
+    entry = profile_entry(instance.pk, instance.slug, instance.user.username)
+    transaction.on_commit(lambda: autocomplete_index.put(*entry))
+
+
+@receiver(post_save, sender=User)
+def update_autocomplete_on_user_save(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Подсказка профиля показывает имя пользователя
+    """
+    if created or (update_fields is not None and set(update_fields) == {'last_login'}):
+        return
+    for profile_id, slug in Profile.objects.filter(user=instance).values_list('id', 'slug'):
+        entry = profile_entry(profile_id, slug, instance.username)
+        transaction.on_commit(lambda entry=entry: autocomplete_index.put(*entry))
+
+
+AUTOCOMPLETE_KINDS = {Post: 'post', Tag: 'tag', Profile: 'profile'}
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Profile)
+def update_autocomplete_on_delete(sender, instance, **kwargs):
+    ref = (AUTOCOMPLETE_KINDS[sender], instance.pk)
+    transaction.on_commit(lambda: autocomplete_index.remove(ref))
@@ -0,0 +1,180 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Max
+from django.http import Http404, HttpResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.views.generic import View
+
+from taggit.models import Tag
+
+from apps.accounts.models import Profile
+
+from .models import Post, Category
+
+
+SITEMAP_CHUNK_SIZE = getattr(settings, 'SITEMAP_CHUNK_SIZE', 50000)
+SITEMAP_INDEX_CACHE_KEY = 'sitemap-index'
+
+
+class SitemapSection:
+    """
+    Раздел карты сайта, разбитый на части по диапазонам первичного ключа
+    """
+
+    name = None
+    url_name = None
+    url_kwarg = 'slug'
+    lastmod_field = None
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def get_chunks(self):
+        """
+        Номера частей раздела и дата их последнего изменения (один GROUP BY по первичному ключу)
+        """
+        queryset = self.get_queryset().order_by().annotate(chunk=F('pk') / SITEMAP_CHUNK_SIZE)
+        if self.lastmod_field:
+            rows = queryset.values('chunk').annotate(last_mod=Max(self.lastmod_field))
+        else:
+            rows = queryset.values('chunk').annotate(total=Count('pk'))
+        return [(row['chunk'], row.get('last_mod')) for row in rows.order_by('chunk')]
+
+    def get_urlset(self, chunk):
+        """
+        Записи одной части: только первичный ключ, slug и дата изменения
+        """
+        fields = ['slug', self.lastmod_field] if self.lastmod_field else ['slug']
+        rows = (
+            self.get_queryset()
+            .filter(pk__gte=chunk * SITEMAP_CHUNK_SIZE, pk__lt=(chunk + 1) * SITEMAP_CHUNK_SIZE)
+            .order_by('pk')
+            .values_list(*fields)
+        )
+        return [
+            {
+                'location': f'{settings.SITE_URL}{reverse(self.url_name, kwargs={self.url_kwarg: row[0]})}',
+                'lastmod': row[1] if self.lastmod_field else None,
+            }
+            for row in rows
+        ]
+
+
+class PostSitemapSection(SitemapSection):
+    name = 'posts'
+    url_name = 'post_detail'
+    lastmod_field = 'update'
+
+    def get_queryset(self):
+        return Post.custom.all()
+
+
+class CategorySitemapSection(SitemapSection):
+    name = 'categories'
+    url_name = 'post_by_category'
+
+    def get_queryset(self):
+        return Category.objects.all()
+
+
+class TagSitemapSection(SitemapSection):
+    name = 'tags'
+    url_name = 'post_by_tags'
+    url_kwarg = 'tag'
+
+    def get_queryset(self):
+        return Tag.objects.all()
+
+
+class ProfileSitemapSection(SitemapSection):
+    name = 'profiles'
+    url_name = 'profile_detail'
+
+    def get_queryset(self):
+        return Profile.objects.all()
+
+
+SITEMAP_SECTIONS = {
+    section.name: section
+    for section in (PostSitemapSection(), CategorySitemapSection(),
+                    TagSitemapSection(), ProfileSitemapSection())
+}
+
+
+def sitemap_chunk_cache_key(section_name, chunk):
+    return f'sitemap-{section_name}-{chunk}'
+
+
+def render_sitemap_index():
+    """
+    Индекс карты сайта со ссылками на все части всех разделов
+    """
+    sitemaps = [
+        {
+            'location': f'{settings.SITE_URL}{reverse("sitemap_section", kwargs={"section": name, "chunk": chunk})}',
+            'last_mod': last_mod,
+        }
+        for name, section in SITEMAP_SECTIONS.items()
+        for chunk, last_mod in section.get_chunks()
+    ]
+    content = render_to_string('sitemap_index.xml', {'sitemaps': sitemaps})
+    cache.set(SITEMAP_INDEX_CACHE_KEY, content, None)
+    return content
+
+
+def render_sitemap_chunk(section_name, chunk):
+    """
+    Отрисовка и кеширование одной части раздела карты сайта
+    """
+    urlset = SITEMAP_SECTIONS[section_name].get_urlset(chunk)
+    if not urlset:
+        return None
+    content = render_to_string('sitemap.xml', {'urlset': urlset})
+    cache.set(sitemap_chunk_cache_key(section_name, chunk), content, None)
+    return content
+
+
+def invalidate_sitemap_chunk(section_name, pk):
+    """
+    Сброс только той части раздела, в которую попадает изменённый объект
+    """
+    cache.delete_many([sitemap_chunk_cache_key(section_name, pk // SITEMAP_CHUNK_SIZE),
+                       SITEMAP_INDEX_CACHE_KEY])
+
+
+def invalidate_sitemap_queryset(section_name, queryset):
+    """
+    Сброс всех частей раздела, в которые попадают объекты выборки (для массовых UPDATE)
+    """
+    chunks = queryset.order_by().annotate(chunk=F('pk') / SITEMAP_CHUNK_SIZE).values_list('chunk', flat=True)
+    cache.delete_many([sitemap_chunk_cache_key(section_name, chunk) for chunk in set(chunks)]
+                      + [SITEMAP_INDEX_CACHE_KEY])
+
+
+class SitemapIndexView(View):
+    """
+    Индекс карты сайта
+    """
+
+    def get(self, request, *args, **kwargs):
+        content = cache.get(SITEMAP_INDEX_CACHE_KEY)
+        if content is None:
+            content = render_sitemap_index()
+        return HttpResponse(content, content_type='application/xml')
+
+
+class SitemapSectionView(View):
+    """
+    Часть раздела карты сайта (не более SITEMAP_CHUNK_SIZE адресов)
+    """
+
+    def get(self, request, section, chunk, *args, **kwargs):
+        if section not in SITEMAP_SECTIONS:
+            raise Http404
+        content = cache.get(sitemap_chunk_cache_key(section, chunk))
+        if content is None:
+            content = render_sitemap_chunk(section, chunk)
+        if content is None:
+            raise Http404
+        return HttpResponse(content, content_type='application/xml')
@@ -0,0 +1,211 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.base import SessionBase
+from django.db import connections
+from django.http import Http404
+from django.urls import Resolver404, resolve, reverse
+from django.utils import timezone
+
+from taggit.models import Tag
+
+from .models import Post, PostArchiveMonth, Category
+
+
+FULL_REBUILD = '*'
+SPOOL_NAME = '.dirty'
+
+
+def get_snapshot_root():
+    return Path(getattr(settings, 'SNAPSHOT_ROOT', settings.BASE_DIR / 'snapshot'))
+
+
+def is_snapshot_enabled():
+    return getattr(settings, 'SNAPSHOT_ENABLED', False)
+
+
+def snapshot_file(path, page=1, extension='.html'):
+    """
+    Файл страницы: /post/slug/ -> post/slug/index.html, вторая страница списка -> page-2.html
+    """
+    name = 'index' if page == 1 else f'page-{page}'
+    return get_snapshot_root() / path.strip('/') / f'{name}{extension}'
+
+
+def write_atomic(target, content):
+    """
+    Запись во временный файл рядом с целевым и замена через os.replace:
+    читатель видит либо старую, либо новую версию целиком
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=target.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            temp_file.write(content)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, target)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def render_page(path, page=1):
+    """
+    Отрисовка страницы так, как её видит анонимный посетитель; хост и схема
+    берутся из SITE_URL, чтобы абсолютные ссылки (лента, canonical) вели на сайт
+    """
+    from django.test import RequestFactory
+
+    site = urlsplit(settings.SITE_URL)
+    factory = RequestFactory(HTTP_HOST=site.netloc, **{'wsgi.url_scheme': site.scheme})
+    request = factory.get(path, {'page': page} if page > 1 else {}, secure=site.scheme == 'https')
+    request.user = AnonymousUser()
+    request.session = SessionBase()
+    try:
+        match = resolve(path)
+        response = match.func(request, *match.args, **match.kwargs)
+    except (Http404, Resolver404, Category.DoesNotExist):
+        return None
+    if hasattr(response, 'render'):
+        response.render()
+    if response.status_code != 200:
+        return None
+    return response
+
+
+def publish_path(path):
+    """
+    Перегенерация всех страниц одного адреса; исчезнувшие страницы удаляются
+    """
+    directory = get_snapshot_root() / path.strip('/')
+    written = []
+    page, num_pages = 1, 1
+    while page <= num_pages:
+        response = render_page(path, page)
+        if response is None:
+            break
+        extension = '.xml' if 'xml' in response.get('Content-Type', '') else '.html'
+        target = snapshot_file(path, page, extension)
+        write_atomic(target, response.content)
+        written.append(target)
+        page_obj = getattr(response, 'context_data', {}).get('page_obj')
+        if page_obj is not None:
+            num_pages = page_obj.paginator.num_pages
+        page += 1
+    if directory.is_dir():
+        for stale in directory.glob('*.*'):
+            if stale.is_file() and stale not in written and stale.name.startswith(('index.', 'page-')):
+                stale.unlink()
+    return path, len(written)
+
+
+def get_all_paths():
+    """
+    Все адреса, публикуемые в статическом режиме
+    """
+    paths = [reverse('home'), reverse('latest_post_feed')]
+    paths += [reverse('post_detail', args=[slug]) for slug in Post.custom.values_list('slug', flat=True)]
+    paths += [reverse('post_by_category', args=[slug]) for slug in Category.objects.values_list('slug', flat=True)]
+    paths += [reverse('post_by_tags', args=[slug]) for slug in Tag.objects.values_list('slug', flat=True)]
+    months = PostArchiveMonth.objects.filter(post_count__gt=0).values_list('year', 'month')
+    paths += sorted({path for year, month in months for path in get_archive_paths(year, month)})
+    return paths
+
+
+def get_archive_paths(year, month):
+    return reverse('post_archive_year', args=[year]), reverse('post_archive_month', args=[year, month])
+
+
+def get_post_paths(post_ids):
+    """
+    Страницы, на которых показаны записи: сама запись, главная, лента, категория
+    (и родительская, куда попадают записи подкатегорий), архив и теги
+    """
+    paths = {reverse('home'), reverse('latest_post_feed')}
+    posts = Post.objects.filter(pk__in=post_ids).values_list(
+        'slug', 'create', 'category__slug', 'category__parent__slug',
+    )
+    for slug, create, category_slug, parent_slug in posts:
+        paths.add(reverse('post_detail', args=[slug]))
+        paths.update(reverse('post_by_category', args=[value]) for value in (category_slug, parent_slug) if value)
+        create = timezone.localtime(create)
+        paths.update(get_archive_paths(create.year, create.month))
+    tags = Tag.objects.filter(post__in=post_ids).values_list('slug', flat=True).distinct()
+    paths.update(reverse('post_by_tags', args=[slug]) for slug in tags)
+    return paths
+
+
+def mark_dirty(*paths):
+    """
+    Запись изменённых адресов в очередь (файл-спул) для инкрементальной публикации
+    """
+    if not is_snapshot_enabled() or not paths:
+        return
+    spool = get_snapshot_root() / SPOOL_NAME
+    spool.parent.mkdir(parents=True, exist_ok=True)
+    # Короткие дописывания в режиме O_APPEND не перемешиваются между процессами
+    with open(spool, 'a', encoding='utf-8') as spool_file:
+        spool_file.write(''.join(f'{path}\n' for path in paths))
+
+
+def take_dirty_paths():
+    """
+    Забрать накопленные адреса: спул переименовывается, новые изменения копятся в новом файле
+    """
+    spool = get_snapshot_root() / SPOOL_NAME
+    processing = spool.with_name(f'{SPOOL_NAME}.processing')
+    if not processing.exists():
+        if not spool.exists():
+            return set()
+        os.replace(spool, processing)
+    return set(processing.read_text(encoding='utf-8').split())
+
+
+def finish_dirty_paths():
+    processing = get_snapshot_root() / f'{SPOOL_NAME}.processing'
+    if processing.exists():
+        processing.unlink()
+
+
+def publish_paths(paths, workers=None):
+    """
+    Параллельная публикация адресов в пуле процессов
+    """
+    # Открытые соединения родителя нельзя разделять с дочерними процессами
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+        return list(executor.map(publish_path, sorted(paths), chunksize=8))
+
+
+def remove_orphans(paths):
+    """
+    Удаление страниц, адресов которых больше нет (полная публикация)
+    """
+    root = get_snapshot_root()
+    keep = {root / path.strip('/') for path in paths}
+    removed = 0
+    for page in root.rglob('*.*'):
+        if page.name.startswith(('index.', 'page-')) and page.parent not in keep:
+            page.unlink()
+            removed += 1
+    return removed
+
+
+def publish(paths, workers=None):
+    """
+    Публикация адресов; FULL_REBUILD в наборе - все страницы с удалением исчезнувших
+    """
+    full = FULL_REBUILD in paths
+    if full:
+        paths = set(get_all_paths())
+    results = publish_paths(paths, workers=workers)
+    removed = remove_orphans(paths) if full else 0
+    finish_dirty_paths()
+    return results, removed
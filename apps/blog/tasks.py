@@ -0,0 +1,91 @@
+from apps.services.warmup import prime_caches
+from apps.tasks.registry import task
+
+from . import notifications, rollups
+from .models import AuthorStats, PostArchiveMonth, TagPostCount
+from .sitemaps import SITEMAP_SECTIONS, render_sitemap_chunk, render_sitemap_index
+from .snapshot import FULL_REBUILD, is_snapshot_enabled, publish, take_dirty_paths
+
+
+@task(name='blog.rebuild_author_stats')
+def rebuild_author_stats(user_ids=None):
+    """
+    Пересчёт статистики авторов (после массовых изменений и ночная сверка)
+    """
+    AuthorStats.objects.rebuild(user_ids=user_ids)
+
+
+@task(name='blog.rebuild_archive')
+def rebuild_archive(months=None):
+    PostArchiveMonth.objects.rebuild(months=[tuple(month) for month in months] if months else None)
+
+
+@task(name='blog.rebuild_tag_counts')
+def rebuild_tag_counts():
+    """
+    Ночная сверка счётчиков тегов с фактическими связями
+    """
+    TagPostCount.objects.rebuild()
+
+
+@task(name='blog.build_sitemaps')
+def build_sitemaps():
+    for name, section in SITEMAP_SECTIONS.items():
+        for chunk, _ in section.get_chunks():
+            render_sitemap_chunk(name, chunk)
+    render_sitemap_index()
+
+
+@task(name='blog.publish_snapshot', max_attempts=1)
+def publish_snapshot():
+    """
+    Инкрементальная публикация статического снимка по накопленным изменениям
+    """
+    if not is_snapshot_enabled():
+        return
+    paths = take_dirty_paths()
+    if paths:
+        publish(paths)
+
+
+@task(name='blog.rebuild_snapshot', max_attempts=1)
+def rebuild_snapshot():
+    """
+    Ночная полная публикация: счётчики боковой панели на страницах,
+    которые не перегенерировались по изменениям, и удаление исчезнувших страниц
+    """
+    if not is_snapshot_enabled():
+        return
+    # Полная публикация покрывает и накопленные изменения
+    take_dirty_paths()
+    publish({FULL_REBUILD})
+
+
+@task(name='blog.warm_caches')
+def warm_caches():
+    prime_caches()
+
+
+@task(name='blog.roll_up_ratings')
+def roll_up_ratings():
+    rollups.roll_up_ratings()
+
+
+@task(name='blog.compact_ratings')
+def compact_ratings():
+    """
+    Ночное сворачивание старых голосов в архив и очистка почасовых свёрток
+    """
+    rollups.roll_up_ratings()
+    rollups.compact_ratings()
+    rollups.prune_hourly_rollups()
+
+
+@task(name='blog.send_notification_digests')
+def send_notification_digests():
+    """
+    Разбор спула событий, дайджесты уведомлений авторам и очистка старых уведомлений
+    """
+    notifications.fold_events()
+    notifications.send_digests()
+    notifications.purge_notifications()
@@ -0,0 +1,92 @@
+from django import template
+from django.core.cache import cache
+
+from apps.blog.models import PostArchiveMonth, TagPostCount
+from apps.blog.notifications import get_unread_count
+from apps.services.cache import (LAYOUT_VARY_OPTIONS, get_layout_timeout,
+                                 get_layout_variant, layout_cache_key)
+
+
+register = template.Library()
+
+
+class LayoutCacheNode(template.Node):
+    """
+    Узел шаблона, кеширующий общий фрагмент макета по варианту пользователя
+    """
+
+    def __init__(self, nodelist, name, vary):
+        self.nodelist = nodelist
+        self.name = name
+        self.vary = vary
+
+    def render(self, context):
+        request = context.get('request')
+        user = getattr(request, 'user', None)
+        cache_key = layout_cache_key(self.name, get_layout_variant(self.vary, user))
+        content = cache.get(cache_key)
+        if content is None:
+            content = self.nodelist.render(context)
+            cache.set(cache_key, content, get_layout_timeout())
+        return content
+
+
+@register.tag('layout_cache')
+def do_layout_cache(parser, token):
+    """
+    Кеширование фрагмента макета:
+
+        {% layout_cache 'sidebar' %} ... {% endlayout_cache %}
+        {% layout_cache 'header' vary='user' %} ... {% endlayout_cache %}
+
+    vary: none - один вариант для всех, auth - гость/авторизован, user - по id пользователя
+    """
+    bits = token.split_contents()
+    if len(bits) not in (2, 3):
+        raise template.TemplateSyntaxError(f"'{bits[0]}' принимает имя фрагмента и необязательный vary=")
+    name = bits[1].strip('\'"')
+    vary = 'none'
+    if len(bits) == 3:
+        option, _, value = bits[2].partition('=')
+        vary = value.strip('\'"')
+        if option != 'vary' or vary not in LAYOUT_VARY_OPTIONS:
+            raise template.TemplateSyntaxError(
+                f"'{bits[0]}': vary должен быть одним из {', '.join(LAYOUT_VARY_OPTIONS)}")
+    nodelist = parser.parse(('endlayout_cache',))
+    parser.delete_first_token()
+    return LayoutCacheNode(nodelist, name, vary)
+
+
+@register.simple_tag
+def post_archive_months():
+    """
+    Месяцы архива с числом опубликованных записей (из предрассчитанной таблицы)
+    """
+    return PostArchiveMonth.objects.filter(post_count__gt=0)
+
+
+@register.simple_tag
+def tag_cloud(limit=30):
+    """
+    Самые используемые теги с размером шрифта 85-165% по числу опубликованных записей
+    (из таблицы счётчиков)
+    """
+    counts = list(TagPostCount.objects.filter(post_count__gt=0).select_related('tag')[:limit])
+    if not counts:
+        return []
+    lowest, highest = counts[-1].post_count, counts[0].post_count
+    for item in counts:
+        weight = (item.post_count - lowest) / (highest - lowest) if highest > lowest else 0.5
+        item.font_size = 85 + round(weight * 80)
+    return sorted(counts, key=lambda item: item.tag.name.lower())
+
+
+@register.simple_tag(takes_context=True)
+def unread_notifications(context):
+    """
+    Число непрочитанных уведомлений пользователя для значка в шапке (из кеша)
+    """
+    user = getattr(context.get('request'), 'user', None)
+    if user is None or not user.is_authenticated:
+        return 0
+    return get_unread_count(user.pk)
@@ -3,7 +3,12 @@ from django.urls import path
 from .views import (PostListView, PostDetailView,
                     PostFromCategory, PostCreateView, PostUpdateView,
                     CommentCreateView, PostByTagListView,
-                    RatingCreateView)
+                    RatingCreateView, AuthorLeaderboardView,
+                    PostArchiveView, PostEventStreamView, PostRatingChartView,
+                    AutocompleteView, CommentThreadsView, CommentRepliesView,
+                    NotificationListView)
+from .api import (PostListApiView, PostDetailApiView, CategoryListApiView,
+                  TagListApiView, CommentThreadApiView)
 
 
 urlpatterns = [
@@ -14,10 +19,18 @@ urlpatterns = [
     path(
         'post/<slug:slug>/update/', PostUpdateView.as_view(),
         name='post_update'),
+    path(
+        'post/<slug:slug>/ratings/', PostRatingChartView.as_view(), name='post_rating_chart'),
     path(
         'post/<slug:slug>/', PostDetailView.as_view(), name='post_detail'),
     path(
         'post/<int:pk>/comments/create/', CommentCreateView.as_view(),name='comment_create-view'),
+    path(
+        'post/<int:pk>/comments/', CommentThreadsView.as_view(), name='comment_threads'),
+    path(
+        'comments/<int:pk>/replies/', CommentRepliesView.as_view(), name='comment_replies'),
+    path(
+        'post/<int:pk>/events/', PostEventStreamView.as_view(), name='post_events'),
     path(
         'post/tags/<slug:tag>/', PostByTagListView.as_view(),
         name='post_by_tags'),
@@ -25,4 +38,26 @@ urlpatterns = [
         'category/<slug:slug>/', PostFromCategory.as_view(),name='post_by_category'),
     path(
         'rating/', RatingCreateView.as_view(), name='rating'),
+    path(
+        'archive/<int:year>/', PostArchiveView.as_view(), name='post_archive_year'),
+    path(
+        'archive/<int:year>/<int:month>/', PostArchiveView.as_view(),
+        name='post_archive_month'),
+    path(
+        'api/posts/', PostListApiView.as_view(), name='api_post_list'),
+    path(
+        'api/posts/<slug:slug>/', PostDetailApiView.as_view(), name='api_post_detail'),
+    path(
+        'api/posts/<slug:slug>/comments/', CommentThreadApiView.as_view(),
+        name='api_comment_thread'),
+    path(
+        'api/categories/', CategoryListApiView.as_view(), name='api_category_list'),
+    path(
+        'api/tags/', TagListApiView.as_view(), name='api_tag_list'),
+    path(
+        'autocomplete/', AutocompleteView.as_view(), name='autocomplete'),
+    path(
+        'notifications/', NotificationListView.as_view(), name='notifications'),
+    path(
+        'authors/', AuthorLeaderboardView.as_view(), name='author_leaderboard'),
 ]
@@ -1,5 +1,13 @@
-from django.http import JsonResponse
+import asyncio
+import json
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
 from django.views.generic import (ListView, DetailView,
                                   CreateView, UpdateView, View)
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -7,38 +15,54 @@ from django.contrib.messages.views import SuccessMessageMixin
 
 from taggit.models import Tag
 
-from .models import Post, Category, Rating
+from .models import (Post, Category, Comment, Notification, Rating, RatingArchive, AuthorStats, TagPostCount,
+                     get_month_range, get_rating_sum)
+from .api import decode_cursor, encode_cursor, serialize_comment
+from .autocomplete import autocomplete_index
+from .notifications import mark_read
+from .rollups import CHART_PERIODS, get_rating_chart
 from .forms import PostCreateForm, PostUpdateForm, CommentCreateForm
-from ..services.mixins import AuthorRequiredMixin
+from ..accounts.loaders import get_author_loader
+from .signals import post_channel
+from ..services.mixins import AuthorRequiredMixin, CachedObjectMixin
+from ..services.paginator import KnownCountPaginator
+from ..services.pubsub import broker
+from ..services.ratelimit import RateLimitMixin
+from ..services.utils import get_client_ip
 
 
-class RatingCreateView(View):
+class RatingCreateView(RateLimitMixin, View):
 
     model = Rating
+    ratelimit_group = 'rating'
 
     def post(self, request, *args, **kwargs):
         post_id = request.POST.get('post_id')
         value = int(request.POST.get('value'))
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        ip = x_forwarded_for.split(
-            ',')[0] if x_forwarded_for else request.META.get('REMOTE_ADDR')
+        ip = get_client_ip(request)
         user = request.user if request.user.is_authenticated else None
-        rating, created = self.model.objects.get_or_create(
-            post_id=post_id, ip_address=ip,
-            defaults={'value': value, 'user':user},
-        )
-        if not created:
-            if rating.value == value:
-                rating.delete()
-            else:
-                rating.value = value
-                rating.user = user
-                rating.save()
-        return JsonResponse({'rating_sum': rating.post.get_sum_rating()})
+        rating = self.model.objects.filter(post_id=post_id, ip_address=ip).first()
+        if rating is None:
+            # Старые голоса свёрнуты в архив, повторно с того же адреса голосовать нельзя
+            if RatingArchive.objects.has_voted(post_id, ip):
+                return JsonResponse({'rating_sum': get_rating_sum(post_id),
+                                     'error': 'Вы уже оценили эту запись'}, status=409)
+            self.model.objects.get_or_create(
+                post_id=post_id, ip_address=ip,
+                defaults={'value': value, 'user':user},
+            )
+        elif rating.value == value:
+            rating.delete()
+        else:
+            rating.value = value
+            rating.user = user
+            rating.save()
+        return JsonResponse({'rating_sum': get_rating_sum(post_id)})
 
 
-class CommentCreateView(LoginRequiredMixin, CreateView):
+class CommentCreateView(RateLimitMixin, LoginRequiredMixin, CreateView):
     form_class = CommentCreateForm
+    ratelimit_group = 'comment'
 
     def is_ajax(self):
         return self.request.headers.get('X-Requested-With') == 'XMLHttpRequest'
@@ -56,19 +80,7 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
         comment.save()
 
         if self.is_ajax():
-            return JsonResponse(
-                {
-                    'is_child': comment.is_child_node(),
-                    'id': comment.id,
-                    'author': comment.author.username,
-                    'parent_id': comment.parent_id,
-                    'time_create': comment.time_create.strftime('%Y-%b-%d %H:%M:%S'),
-                    'avatar': comment.author.profile.avatar.url,
-                    'content': comment.content,
-                    'get_absolute_url': comment.author.profile.get_absolute_url(),
-                },
-                status=200,
-            )
+            return JsonResponse(serialize_comment(comment), status=200)
 
         return redirect(comment.post.get_absolute_url())
 
@@ -76,7 +88,59 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
         return JsonResponse({'error': 'Необходимо авторизоваться для добавления комментариев'}, status=400)
 
 
-class PostUpdateView(AuthorRequiredMixin, SuccessMessageMixin, UpdateView):
+class AutocompleteView(View):
+    """
+    Подсказки поиска по названиям записей, тегам и авторам из индекса в памяти процесса
+    """
+
+    limit = 10
+    min_length = 2
+
+    def get(self, request, *args, **kwargs):
+        query = request.GET.get('q', '').strip()[:100]
+        results = []
+        if len(query) >= self.min_length:
+            results = [{'type': kind, 'label': label, 'url': url}
+                       for (kind, pk), label, url in autocomplete_index.search(query, self.limit)]
+        response = JsonResponse({'results': results})
+        patch_cache_control(response, public=True, max_age=60)
+        return response
+
+
+class PostEventStreamView(View):
+    """
+    Поток server-sent events записи: новые комментарии и сумма рейтинга
+    """
+
+    async def get(self, request, pk, *args, **kwargs):
+        if not await Post.custom.filter(pk=pk).aexists():
+            raise Http404
+        if not isinstance(request, ASGIRequest):
+            # Без ASGI бесконечный поток заблокирует воркер; 204 останавливает переподключения EventSource
+            return HttpResponse(status=204)
+        response = StreamingHttpResponse(self.stream(post_channel(pk)), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def stream(self, channel):
+        heartbeat = getattr(settings, 'SSE_HEARTBEAT_INTERVAL', 15)
+        queue = broker.subscribe(channel)
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    event_type, data = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    # Комментарий-пинг держит соединение открытым через прокси
+                    yield ': ping\n\n'
+                    continue
+                yield f'event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'
+        finally:
+            broker.unsubscribe(channel, queue)
+
+
+class PostUpdateView(AuthorRequiredMixin, CachedObjectMixin, SuccessMessageMixin, UpdateView):
     """
     Представление: обновления материала на сайте
     """
@@ -133,7 +197,7 @@ class PostFromCategory(ListView):
         if not queryset:
             sub_cat = Category.objects.filter(parent=self.category)
             queryset = Post.custom.filter(category__in=sub_cat)
-        return queryset
+        return queryset.prefetch_related('tags')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -146,7 +210,7 @@ class PostListView(ListView):
     template_name = 'blog/post_list.html'
     context_object_name = 'posts'
     paginate_by = 2
-    queryset = Post.custom.all()
+    queryset = Post.custom.prefetch_related('tags')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -160,19 +224,19 @@ class PostByTagListView(ListView):
     template_name = 'blog/post_list.html'
     context_object_name = 'posts'
     paginate_by = 10
+    paginator_class = KnownCountPaginator
     tag = None
 
     def get_queryset(self):
         self.tag = get_object_or_404(Tag, slug=self.kwargs.get('tag'))
-        queryset = (
-            Post.objects.select_related(
-                'author',
-                'category',
-            )
-            .prefetch_related('tags')
-            .filter(tags=self.tag)
-        )
-        return queryset
+        return Post.custom.filter(tags=self.tag).prefetch_related('tags')
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        """
+        Число записей берётся из счётчиков тегов, COUNT(*) по связям не выполняется
+        """
+        count = TagPostCount.objects.filter(tag=self.tag).values_list('post_count', flat=True).first()
+        return super().get_paginator(queryset, per_page, orphans, allow_empty_first_page, count=count, **kwargs)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -180,9 +244,92 @@ class PostByTagListView(ListView):
         return context
 
 
-class PostDetailView(DetailView):
+class CommentTreeMixin:
+    """
+    Дерево комментариев по страницам: ветки (корневые комментарии) и ответы
+    до глубины comment_depth, более глубокие ответы подгружаются отдельно
+    """
+
+    threads_per_page = 10
+    replies_per_page = 20
+    comment_depth = 2
+
+    def get_thread_page(self, post_id, after=None):
+        nodes, next_after = Comment.objects.thread_page(
+            post_id, self.comment_depth, self.threads_per_page, self.replies_per_page, after,
+        )
+        next_url = reverse('comment_threads', args=[post_id]) if next_after is not None else None
+        return self.add_replies_urls(nodes), self.comment_page_url(next_url, next_after), self.comment_depth
+
+    def get_reply_page(self, parent, after=None):
+        nodes, next_after = Comment.objects.reply_page(parent, self.comment_depth, self.replies_per_page, after)
+        next_url = reverse('comment_replies', args=[parent.pk]) if next_after is not None else None
+        return self.add_replies_urls(nodes), self.comment_page_url(next_url, next_after), parent.level + self.comment_depth
+
+    def add_replies_urls(self, comments):
+        """
+        Адрес подгрузки ответов, не вошедших в страницу (кнопка «Ещё ответы»)
+        """
+        for comment in comments:
+            after = getattr(comment, 'replies_after', None)
+            if after is not None:
+                comment.replies_url = self.comment_page_url(reverse('comment_replies', args=[comment.pk]), after)
+        return comments
+
+    @staticmethod
+    def comment_page_url(url, after):
+        return f'{url}?cursor={encode_cursor(after)}' if url else None
+
+    def get_cursor(self):
+        cursor = self.request.GET.get('cursor')
+        if not cursor:
+            return None
+        values = decode_cursor(cursor)
+        if not values or len(values) != 1:
+            raise Http404('Некорректный курсор')
+        return values[0]
+
+    def load_comment_authors(self, comments, *user_ids):
+        authors = get_author_loader(self.request)
+        authors.add(*user_ids, *(comment.author_id for comment in comments))
+        authors.load()
+        return authors
+
+    def render_comments(self, comments, next_url, max_level):
+        """
+        Фрагмент дерева для comments.js: HTML узлов и адрес следующей страницы
+        """
+        html = render_to_string('blog/comments/comment_nodes.html', {
+            'comments': comments,
+            'max_level': max_level,
+            'authors': self.load_comment_authors(comments),
+        }, self.request)
+        return JsonResponse({'html': html, 'next': next_url})
+
+
+class CommentThreadsView(CommentTreeMixin, View):
+    """
+    Следующая страница веток комментариев записи
+    """
+
+    def get(self, request, pk, *args, **kwargs):
+        return self.render_comments(*self.get_thread_page(pk, self.get_cursor()))
+
+
+class CommentRepliesView(CommentTreeMixin, View):
+    """
+    Ответы на комментарий, не показанные из-за ограничения глубины, по страницам
+    """
+
+    def get(self, request, pk, *args, **kwargs):
+        parent = get_object_or_404(Comment.objects.only('tree_id', 'lft', 'rght', 'level'), pk=pk)
+        return self.render_comments(*self.get_reply_page(parent, self.get_cursor()))
+
+
+class PostDetailView(CachedObjectMixin, CommentTreeMixin, DetailView):
 
     model = Post
+    object_prefetch = ('tags',)
     template_name = 'blog/post_detail.html'
     context_object_name = 'post'
 
@@ -190,4 +337,92 @@ class PostDetailView(DetailView):
         context = super().get_context_data(**kwargs)
         context['title'] = self.object.title
         context['form'] = CommentCreateForm
+        comments, next_url, max_level = self.get_thread_page(self.object.pk)
+        context['comments'] = comments
+        context['comments_next'] = next_url
+        context['max_level'] = max_level
+        context['authors'] = self.load_comment_authors(comments, self.object.author_id)
+        return context
+
+
+class PostRatingChartView(AuthorRequiredMixin, CachedObjectMixin, DetailView):
+    """
+    График оценок записи по свёрткам (автору и администраторам)
+    """
+
+    model = Post
+    template_name = 'blog/post_rating_chart.html'
+    context_object_name = 'post'
+    permission_denied_message = 'Статистика оценок доступна только автору записи.'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        period = self.request.GET.get('period')
+        period = period if period in CHART_PERIODS else 'day'
+        context['title'] = f'Оценки записи: {self.object.title}'
+        context['period'] = period
+        context['chart'] = get_rating_chart(self.object, period)
+        return context
+
+
+class AuthorLeaderboardView(ListView):
+    """
+    Рейтинг авторов по предрассчитанной статистике
+    """
+
+    template_name = 'blog/author_leaderboard.html'
+    context_object_name = 'authors_stats'
+    paginate_by = 20
+    queryset = AuthorStats.objects.select_related('user__profile').order_by('-rating_total')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['title'] = 'Рейтинг авторов'
+        return context
+
+
+class NotificationListView(LoginRequiredMixin, ListView):
+    """
+    Уведомления пользователя о комментариях и оценках его записей; просмотр отмечает их прочитанными
+    """
+
+    template_name = 'blog/notifications.html'
+    context_object_name = 'notifications'
+    paginate_by = 20
+    login_url = 'login'
+
+    def get_queryset(self):
+        return Notification.objects.filter(recipient=self.request.user).select_related('post', 'actor')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['title'] = 'Уведомления'
+        # Страница загружается до отметки, чтобы новые уведомления были выделены
+        context['notifications'] = list(context['notifications'])
+        mark_read(self.request.user.pk)
+        return context
+
+
+class PostArchiveView(ListView):
+    """
+    Архив записей за год или месяц (фильтр по диапазону даты создания)
+    """
+
+    template_name = 'blog/post_list.html'
+    context_object_name = 'posts'
+    paginate_by = 10
+
+    def get_queryset(self):
+        try:
+            start, end = get_month_range(self.kwargs['year'], self.kwargs.get('month'))
+        except ValueError:
+            raise Http404('Такого периода в архиве нет')
+        return Post.custom.filter(create__gte=start, create__lt=end).prefetch_related('tags')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.kwargs.get('month'):
+            context['title'] = f'Архив записей: {self.kwargs["month"]:02}.{self.kwargs["year"]}'
+        else:
+            context['title'] = f'Архив записей: {self.kwargs["year"]}'
         return context
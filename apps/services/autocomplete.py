@@ -0,0 +1,282 @@
+import heapq
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+WORD_RE = re.compile(r'\w+')
+
+
+def normalize(text):
+    return text.casefold().replace('ё', 'е')
+
+
+def split_words(text):
+    return WORD_RE.findall(normalize(text))
+
+
+class PrefixIndex:
+    """
+    Индекс префиксов в памяти процесса: отсортированный список ключей (слов)
+    и параллельный список ссылок на элементы, поиск - bisect по префиксу.
+    Слова элемента хранятся строкой через пробел (с пробелом в начале): проверка
+    префикса - поиск подстроки « префикс» вместо перебора слов.
+    Объём ограничен бюджетом памяти: при превышении вытесняются наименее важные
+    элементы - загруженные последними (load получает их в порядке важности)
+    """
+
+    # Сколько кандидатов из диапазона ключей проверяется за один поиск
+    max_candidates = 1000
+
+    def __init__(self, memory_budget):
+        self.memory_budget = memory_budget
+        self.keys = []
+        self.refs = []
+        self.items = {}
+        self.memory = 0
+        self.truncated = False
+        # Очередь вытеснения (-ранг, ссылка); устаревшие записи пропускаются при извлечении
+        self.eviction = []
+        self.front_rank = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def estimate_size(ref, label, url, words):
+        """
+        Приблизительный размер элемента: строки и по одной ссылке в обоих списках на слово
+        """
+        return (sys.getsizeof(label) + sys.getsizeof(url) + sys.getsizeof(ref)
+                + sum(sys.getsizeof(word) + 16 for word in words) + sys.getsizeof(' '.join(words)))
+
+    @staticmethod
+    def join_words(words):
+        return ''.join(f' {word}' for word in words)
+
+    def _remove(self, ref):
+        item = self.items.pop(ref, None)
+        if item is None:
+            return
+        label, url, text, size, rank = item
+        for word in text.split():
+            index = bisect_left(self.keys, word)
+            while index < len(self.keys) and self.keys[index] == word:
+                if self.refs[index] == ref:
+                    del self.keys[index]
+                    del self.refs[index]
+                    break
+                index += 1
+        self.memory -= size
+
+    def _evict(self, size):
+        """
+        Освобождение места под элемент размером size за счёт наименее важных
+        """
+        while self.memory + size > self.memory_budget and self.eviction:
+            rank, ref = heapq.heappop(self.eviction)
+            item = self.items.get(ref)
+            if item is not None and item[4] == -rank:
+                self._remove(ref)
+                self.truncated = True
+
+    def _put(self, ref, label, url):
+        current = self.items.get(ref)
+        if current is not None:
+            # Изменение элемента сохраняет его место в очереди вытеснения
+            rank = current[4]
+        else:
+            # Новый элемент важнее всех существующих
+            self.front_rank -= 1
+            rank = self.front_rank
+        self._remove(ref)
+        words = tuple(dict.fromkeys(split_words(label)))
+        size = self.estimate_size(ref, label, url, words)
+        if size > self.memory_budget:
+            self.truncated = True
+            return False
+        heapq.heappush(self.eviction, (-rank, ref))
+        self._evict(size)
+        for word in words:
+            index = bisect_right(self.keys, word)
+            self.keys.insert(index, word)
+            self.refs.insert(index, ref)
+        self.items[ref] = (label, url, self.join_words(words), size, rank)
+        self.memory += size
+        return True
+
+    def put(self, ref, label, url):
+        with self.lock:
+            return self._put(ref, label, url)
+
+    def remove(self, ref):
+        with self.lock:
+            self._remove(ref)
+
+    def load(self, entries):
+        """
+        Полная загрузка: элементы сортируются один раз, а не вставляются по одному
+        """
+        pairs, items, memory, truncated = [], {}, 0, False
+        for rank, (ref, label, url) in enumerate(entries):
+            words = tuple(dict.fromkeys(split_words(label)))
+            size = self.estimate_size(ref, label, url, words)
+            if memory + size > self.memory_budget:
+                truncated = True
+                break
+            items[ref] = (label, url, self.join_words(words), size, rank)
+            memory += size
+            pairs.extend((word, ref) for word in words)
+        pairs.sort(key=lambda pair: pair[0])
+        eviction = [(-item[4], ref) for ref, item in items.items()]
+        heapq.heapify(eviction)
+        with self.lock:
+            self.keys = [word for word, ref in pairs]
+            self.refs = [ref for word, ref in pairs]
+            self.items, self.memory, self.truncated = items, memory, truncated
+            self.eviction, self.front_rank = eviction, 0
+
+    def _key_range(self, prefix):
+        """
+        Границы ключей, начинающихся с prefix
+        """
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return bisect_left(self.keys, prefix), bisect_left(self.keys, upper)
+
+    def search(self, query, limit=10):
+        """
+        Элементы, в названии которых у каждого слова запроса есть слово с таким префиксом.
+        Кандидаты берутся из самого узкого диапазона ключей (обычно самого длинного
+        слова), проверяется не больше max_candidates из них и только по остальным
+        словам запроса - слову диапазона кандидат соответствует по построению
+        """
+        words = tuple(dict.fromkeys(split_words(query)))
+        if not words:
+            return []
+        results, seen = [], set()
+        with self.lock:
+            ranges = [self._key_range(word) for word in words]
+            narrowest = min(range(len(words)), key=lambda number: ranges[number][1] - ranges[number][0])
+            start, end = ranges[narrowest]
+            others = [f' {word}' for number, word in enumerate(words) if number != narrowest]
+            for ref in self.refs[start:min(end, start + self.max_candidates)]:
+                if ref in seen:
+                    continue
+                seen.add(ref)
+                label, url, text, size, rank = self.items[ref]
+                if all(other in text for other in others):
+                    results.append((ref, label, url))
+                    if len(results) >= limit:
+                        break
+        return results
+
+    def stats(self):
+        return {'items': len(self.items), 'keys': len(self.keys),
+                'memory': self.memory, 'truncated': self.truncated}
+
+
+class SharedPrefixIndex:
+    """
+    Индекс префиксов процесса, синхронизируемый между процессами через кеш:
+    изменения применяются локально и пишутся в журнал с номером версии,
+    остальные процессы не чаще раза в check_interval догоняют журнал,
+    а при пропуске записей (истекли в кеше) перестраивают индекс полностью
+    """
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self.index = None
+        self.version = 0
+        self.checked = 0
+        self.lock = threading.Lock()
+
+    @property
+    def version_key(self):
+        return f'autocomplete-{self.name}-version'
+
+    def change_key(self, version):
+        return f'autocomplete-{self.name}-change-{version}'
+
+    def get_memory_budget(self):
+        return getattr(settings, 'AUTOCOMPLETE_MEMORY_BUDGET', 16 * 1024 * 1024)
+
+    def get_check_interval(self):
+        return getattr(settings, 'AUTOCOMPLETE_CHECK_INTERVAL', 1.0)
+
+    def get_change_ttl(self):
+        return getattr(settings, 'AUTOCOMPLETE_CHANGE_TTL', 10 * 60)
+
+    def build(self):
+        version = cache.get_or_set(self.version_key, 0, None)
+        index = PrefixIndex(self.get_memory_budget())
+        index.load(self.loader())
+        self.index, self.version, self.checked = index, version, time.monotonic()
+        return index
+
+    def sync(self):
+        """
+        Применение изменений других процессов из журнала в кеше
+        """
+        current = cache.get(self.version_key, 0)
+        if current == self.version:
+            return
+        versions = range(self.version + 1, current + 1)
+        changes = cache.get_many([self.change_key(version) for version in versions])
+        if current < self.version or len(changes) < len(versions):
+            self.build()
+            return
+        for version in versions:
+            self.apply(*changes[self.change_key(version)])
+        self.version = current
+
+    def apply(self, action, ref, label=None, url=None):
+        if action == 'put':
+            self.index.put(ref, label, url)
+        else:
+            self.index.remove(ref)
+
+    def get_index(self):
+        with self.lock:
+            if self.index is None:
+                self.build()
+            elif time.monotonic() - self.checked >= self.get_check_interval():
+                self.checked = time.monotonic()
+                self.sync()
+            return self.index
+
+    def publish(self, action, ref, label=None, url=None):
+        """
+        Изменение элемента: сразу в индексе этого процесса и в журнал для остальных
+        """
+        change = (action, ref, label, url)
+        cache.add(self.version_key, 0, None)
+        try:
+            version = cache.incr(self.version_key)
+            # incr файлового кеша перезаписывает ключ со сроком жизни по умолчанию
+            cache.touch(self.version_key, None)
+        except ValueError:
+            cache.set(self.version_key, 1, None)
+            version = 1
+        cache.set(self.change_key(version), change, self.get_change_ttl())
+        with self.lock:
+            if self.index is None:
+                return
+            if version == self.version + 1:
+                self.apply(*change)
+                self.version = version
+            else:
+                # Пропущены чужие изменения - догоняем журнал, он уже содержит и это
+                self.sync()
+
+    def put(self, ref, label, url):
+        self.publish('put', ref, label, url)
+
+    def remove(self, ref):
+        self.publish('remove', ref)
+
+    def search(self, query, limit=10):
+        return self.get_index().search(query, limit)
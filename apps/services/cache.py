@@ -0,0 +1,49 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+LAYOUT_VARY_OPTIONS = ('none', 'auth', 'user')
+
+
+def get_layout_timeout():
+    """
+    Время жизни закешированных фрагментов макета (в секундах)
+    """
+    return getattr(settings, 'LAYOUT_CACHE_TIMEOUT', 60 * 60)
+
+
+def get_layout_variant(vary, user=None):
+    """
+    Минимальный ключ варианта фрагмента: общий, гость/авторизован или id пользователя
+    """
+    if vary == 'none':
+        return 'all'
+    is_authenticated = user is not None and user.is_authenticated
+    if vary == 'auth':
+        return 'auth' if is_authenticated else 'anon'
+    return f'user-{user.pk}' if is_authenticated else 'anon'
+
+
+def get_layout_version(name):
+    """
+    Текущая версия фрагмента макета. Версия - уникальная метка времени без срока
+    жизни: и при вытеснении ключа из кеша новая версия не совпадёт со старой
+    """
+    return cache.get_or_set(f'layout-version-{name}', time.time_ns, None)
+
+
+def layout_cache_key(name, variant):
+    """
+    Ключ кеша фрагмента макета с учётом версии и варианта
+    """
+    return f'layout-{name}-v{get_layout_version(name)}-{variant}'
+
+
+def invalidate_layout(*names):
+    """
+    Сброс закешированных фрагментов макета сменой их версии (incr файлового
+    кеша записал бы ключ со сроком жизни по умолчанию)
+    """
+    cache.set_many({f'layout-version-{name}': time.time_ns() for name in names}, None)
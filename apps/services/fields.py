@@ -0,0 +1,43 @@
+import zlib
+
+from django.db import models
+
+
+class CompressedTextField(models.BinaryField):
+    """
+    Текст, хранящийся в базе сжатым zlib: сжимается при записи,
+    распаковывается при загрузке строки
+    """
+
+    description = 'Сжатый текст'
+
+    def __init__(self, *args, level=6, **kwargs):
+        self.level = level
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.level != 6:
+            kwargs['level'] = self.level
+        return name, path, args, kwargs
+
+    def get_default(self):
+        return '' if not self.has_default() else super().get_default()
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if isinstance(value, str):
+            value = zlib.compress(value.encode(), self.level)
+        return super().get_db_prep_value(value, connection, prepared)
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return zlib.decompress(bytes(value)).decode()
+
+    def to_python(self, value):
+        if isinstance(value, (bytes, memoryview)):
+            return zlib.decompress(bytes(value)).decode()
+        return value
+
+    def value_to_string(self, obj):
+        return self.value_from_object(obj)
@@ -0,0 +1,153 @@
+import gzip
+import hashlib
+import secrets
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import StreamingBuffer, compress_sequence, compress_string
+
+from .staticfiles import brotli, parse_accept_encoding
+
+
+COMPRESSIBLE_CONTENT_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'application/xml',
+    'application/rss+xml', 'application/atom+xml', 'image/svg+xml',
+)
+
+
+def brotli_sequence(sequence):
+    compressor = brotli.Compressor()
+    for chunk in sequence:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def abrotli_sequence(sequence):
+    compressor = brotli.Compressor()
+    async for chunk in sequence:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def agzip_sequence(sequence, max_random_bytes):
+    """
+    Асинхронный аналог django.utils.text.compress_sequence: один gzip-поток
+    на весь ответ, после каждого фрагмента - flush, чтобы события потока
+    доходили до клиента сразу
+    """
+    buf = StreamingBuffer()
+    filename = b'a' * secrets.randbelow(max_random_bytes) if max_random_bytes else None
+    with gzip.GzipFile(filename=filename, mode='wb', compresslevel=6, fileobj=buf, mtime=0) as zfile:
+        yield buf.read()
+        async for chunk in sequence:
+            zfile.write(chunk)
+            zfile.flush()
+            data = buf.read()
+            if data:
+                yield data
+    yield buf.read()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Сжатие ответов brotli или gzip. Сжатые байты кешируемых ответов
+    (без cookie, не private, без CSRF-токена) хранятся в кеше по ETag,
+    поэтому одинаковая страница сжимается один раз
+    """
+
+    max_random_bytes = 100
+
+    @property
+    def min_size(self):
+        return getattr(settings, 'COMPRESSION_MIN_SIZE', 200)
+
+    @property
+    def cache_timeout(self):
+        return getattr(settings, 'COMPRESSION_CACHE_TIMEOUT', 60 * 60)
+
+    def get_encoding(self, request):
+        accepted = parse_accept_encoding(request.headers.get('Accept-Encoding', ''))
+        if brotli is not None and 'br' in accepted:
+            return 'br'
+        if 'gzip' in accepted:
+            return 'gzip'
+        return None
+
+    def is_cacheable(self, request, response):
+        """
+        Ответ одинаков для всех, кто пришёл с тем же ETag
+        """
+        cache_control = response.get('Cache-Control', '')
+        return (
+            response.has_header('ETag')
+            and not response.cookies
+            and 'private' not in cache_control
+            and 'no-store' not in cache_control
+            # Страницы с CSRF-токеном сжимаются со случайными байтами (защита от BREACH)
+            and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+        )
+
+    def compress(self, content, encoding, deterministic):
+        if encoding == 'br':
+            return brotli.compress(content)
+        if deterministic:
+            return gzip.compress(content, compresslevel=6, mtime=0)
+        return compress_string(content, max_random_bytes=self.max_random_bytes)
+
+    def get_compressed(self, request, response, encoding):
+        if not self.is_cacheable(request, response):
+            return self.compress(response.content, encoding, deterministic=False)
+        cache = caches[getattr(settings, 'COMPRESSION_CACHE_ALIAS', 'default')]
+        digest = hashlib.md5(f'{response["ETag"]}:{response.get("Content-Type")}'.encode()).hexdigest()
+        cache_key = f'compressed-{encoding}-{digest}'
+        compressed = cache.get(cache_key)
+        if compressed is None:
+            compressed = self.compress(response.content, encoding, deterministic=True)
+            cache.set(cache_key, compressed, self.cache_timeout)
+        return compressed
+
+    def compress_stream(self, response, encoding):
+        if encoding == 'br':
+            if response.is_async:
+                return abrotli_sequence(response.streaming_content)
+            return brotli_sequence(response.streaming_content)
+        if response.is_async:
+            return agzip_sequence(response.streaming_content, self.max_random_bytes)
+        return compress_sequence(response.streaming_content, max_random_bytes=self.max_random_bytes)
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '')
+        # Поток событий (SSE) должен уходить клиенту без буферизации
+        if content_type.startswith('text/event-stream') or not content_type.startswith(COMPRESSIBLE_CONTENT_TYPES):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self.get_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = self.compress_stream(response, encoding)
+            del response.headers['Content-Length']
+        else:
+            compressed = self.get_compressed(request, response, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -1,5 +1,7 @@
 from django.contrib.auth.mixins import AccessMixin
 from django.contrib import messages
+from django.db.models import prefetch_related_objects
+from django.http import Http404
 from django.shortcuts import redirect
 
 
@@ -7,10 +9,34 @@ class AuthorRequiredMixin(AccessMixin):
 
     def dispatch(self, request, *args, **kwargs):
         if not request.user.is_authenticated:
-            return self.handle_no_permission
+            return self.handle_no_permission()
         if request.user.is_authenticated:
             if not (request.user == self.get_object(
                 ).author or request.user.is_staff):
-                messages.info(request, 'Изменение статьи не доступно.')
+                messages.info(request, self.permission_denied_message or 'Изменение статьи не доступно.')
                 return redirect('home')
-        return super().dispatch(request, *args, **kwargs)
\ No newline at end of file
+        return super().dispatch(request, *args, **kwargs)
+
+
+class CachedObjectMixin:
+    """
+    Объект представления из кеша менеджера модели (get_cached) по slug или pk.
+    Повторные вызовы get_object() в пределах запроса (например, из
+    AuthorRequiredMixin и самого представления) возвращают тот же объект
+    """
+
+    object_prefetch = ()
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_cached_object'):
+            pk = self.kwargs.get(self.pk_url_kwarg)
+            slug = self.kwargs.get(self.slug_url_kwarg)
+            obj = self.model._default_manager.get_cached(pk=pk, slug=None if pk is not None else slug)
+            if obj is None:
+                raise Http404(f'Объект «{self.model._meta.verbose_name}» не найден')
+            if self.object_prefetch:
+                prefetch_related_objects([obj], *self.object_prefetch)
+            self._cached_object = obj
+        return self._cached_object
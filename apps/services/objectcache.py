@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+
+
+def get_object_cache_timeout():
+    """
+    Время жизни закешированных объектов (в секундах)
+    """
+    return getattr(settings, 'OBJECT_CACHE_TIMEOUT', 10 * 60)
+
+
+class CachedObjectManager(models.Manager):
+    """
+    Менеджер с кешем объектов (read-through) по первичному ключу и slug.
+    Объект хранится под ключом pk вместе со связями cache_related, ключ slug
+    хранит только pk: после смены slug старый ключ не вернёт объект,
+    так как slug объекта проверяется при чтении
+    """
+
+    cache_related = ()
+
+    def object_key(self, pk):
+        return f'object-{self.model._meta.label_lower}-{pk}'
+
+    def slug_key(self, slug):
+        return f'object-{self.model._meta.label_lower}-slug-{slug}'
+
+    def load(self, **lookup):
+        # Без сортировки модели: поиск по уникальному полю
+        obj = next(iter(self.get_queryset().select_related(*self.cache_related).filter(**lookup).order_by()[:1]), None)
+        if obj is not None:
+            cache.set_many({self.object_key(obj.pk): obj, self.slug_key(obj.slug): obj.pk},
+                           get_object_cache_timeout())
+        return obj
+
+    def get_cached(self, pk=None, slug=None):
+        """
+        Объект по pk или slug из кеша, при промахе - из базы данных; None, если объекта нет
+        """
+        if pk is None:
+            pk = cache.get(self.slug_key(slug))
+            if pk is None:
+                return self.load(slug=slug)
+        obj = cache.get(self.object_key(pk))
+        if obj is not None and (slug is None or obj.slug == slug):
+            return obj
+        return self.load(pk=pk) if slug is None else self.load(slug=slug)
+
+    def invalidate(self, *pks, slugs=()):
+        """
+        Сброс закешированных объектов после фиксации транзакции
+        """
+        keys = [self.object_key(pk) for pk in pks] + [self.slug_key(slug) for slug in slugs]
+        if keys:
+            transaction.on_commit(lambda: cache.delete_many(keys))
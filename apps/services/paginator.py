@@ -0,0 +1,66 @@
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+
+def estimate_table_rows(model, using='default'):
+    """
+    Приблизительное число строк таблицы без COUNT(*): статистика СУБД
+    или максимальный первичный ключ
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    query = {
+        'sqlite': 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+        'postgresql': 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+    }.get(connection.vendor)
+    if query:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(query, [table])
+                row = cursor.fetchone()
+        except DatabaseError:
+            row = None
+        if row and row[0] is not None:
+            estimate = int(str(row[0]).split()[0])
+            if estimate > 0:
+                return estimate
+    return model._default_manager.using(using).aggregate(max_pk=Max('pk'))['max_pk'] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор для больших таблиц: без фильтров число строк оценивается,
+    с фильтрами считается не дальше exact_count_limit строк
+    """
+
+    exact_count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not hasattr(queryset, 'query'):
+            return super().count
+        if not queryset.query.where:
+            estimate = estimate_table_rows(queryset.model, queryset.db)
+            if estimate > self.exact_count_limit:
+                return estimate
+        return queryset.order_by()[:self.exact_count_limit].count()
+
+
+class KnownCountPaginator(Paginator):
+    """
+    Пагинатор с числом объектов из таблицы счётчиков вместо COUNT(*);
+    без переданного значения считает как обычный
+    """
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        self.known_count = count
+        super().__init__(object_list, per_page, **kwargs)
+
+    @cached_property
+    def count(self):
+        if self.known_count is None:
+            return super().count
+        return self.known_count
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+logger = logging.getLogger(__name__)
+
+
+class EventBroker:
+    """
+    Лёгкая шина событий: подписчики - очереди asyncio внутри процесса,
+    рассылка между воркерами - через общий кеш (счётчик последовательности
+    канала и события под ключами с номером). В каждом процессе один опрос
+    кеша на канал, сколько бы соединений его ни слушало.
+    """
+
+    queue_size = 100
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._pollers = {}
+
+    @property
+    def poll_interval(self):
+        return getattr(settings, 'PUBSUB_POLL_INTERVAL', 1.0)
+
+    @property
+    def event_ttl(self):
+        return getattr(settings, 'PUBSUB_EVENT_TTL', 60)
+
+    @property
+    def gap_timeout(self):
+        return getattr(settings, 'PUBSUB_GAP_TIMEOUT', 5)
+
+    @staticmethod
+    def _sequence_key(channel):
+        return f'pubsub-{channel}-seq'
+
+    @staticmethod
+    def _event_key(channel, sequence):
+        return f'pubsub-{channel}-{sequence}'
+
+    def publish(self, channel, event_type, data):
+        """
+        Публикация события из любого процесса (синхронный код, сигналы моделей)
+        """
+        sequence_key = self._sequence_key(channel)
+        cache.add(sequence_key, 0, None)
+        for _ in range(5):
+            try:
+                sequence = cache.incr(sequence_key)
+            except ValueError:
+                cache.add(sequence_key, 0, None)
+                continue
+            # incr файлового кеша записывает ключ со сроком жизни по умолчанию (300 с):
+            # без touch нумерация канала начиналась бы заново после паузы в событиях
+            cache.touch(sequence_key, None)
+            # add не перезапишет событие, если номер уже занят другим воркером
+            if cache.add(self._event_key(channel, sequence), (event_type, data), self.event_ttl):
+                return sequence
+        logger.warning('Не удалось опубликовать событие в канал %s', channel)
+        return None
+
+    def subscribe(self, channel):
+        """
+        Подписка текущего соединения: возвращает очередь событий канала
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[channel].add(queue)
+        poller = self._pollers.get((loop, channel))
+        if poller is None or poller.done():
+            self._pollers[(loop, channel)] = loop.create_task(self._poll(loop, channel))
+        return queue
+
+    def unsubscribe(self, channel, queue):
+        self._subscribers[channel].discard(queue)
+        if not self._subscribers[channel]:
+            del self._subscribers[channel]
+            for (loop, poller_channel), poller in list(self._pollers.items()):
+                if poller_channel == channel:
+                    poller.cancel()
+                    del self._pollers[(loop, poller_channel)]
+
+    async def _poll(self, loop, channel):
+        sequence_key = self._sequence_key(channel)
+        last = await cache.aget(sequence_key) or 0
+        # Пропуск в нумерации: (время обнаружения, номер последнего выданного к этому времени)
+        gap = None
+        while self._subscribers.get(channel):
+            await asyncio.sleep(self.poll_interval)
+            current = await cache.aget(sequence_key) or 0
+            if current < last:
+                # Счётчик канала пропал из кеша и нумерация началась заново
+                last, gap = 0, None
+            if current == last:
+                continue
+            keys = [self._event_key(channel, sequence) for sequence in range(last + 1, current + 1)]
+            events = await cache.aget_many(keys)
+            for sequence, key in enumerate(keys, start=last + 1):
+                if key not in events:
+                    # Номер выдан, но событие ещё не записано (или потеряно): ждём его
+                    # не дольше PUBSUB_GAP_TIMEOUT. Номера, выданные до обнаружения
+                    # пропуска, ждут вместе с ним, более поздние - отдельно
+                    if gap is None or sequence > gap[1]:
+                        gap = (loop.time(), current)
+                    if loop.time() - gap[0] < self.gap_timeout:
+                        break
+                    last = sequence
+                    continue
+                for queue in list(self._subscribers.get(channel, ())):
+                    if queue.full():
+                        # Медленный клиент пропускает событие, а не задерживает остальных
+                        continue
+                    queue.put_nowait(events[key])
+                last = sequence
+
+
+broker = EventBroker()
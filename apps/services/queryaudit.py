@@ -0,0 +1,102 @@
+import hashlib
+import os
+import re
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.template.base import Node
+
+
+SCAN_RE = re.compile(r'^SCAN (?:TABLE )?(?P<table>\w+)(?: AS \w+)?(?P<rest>.*)$')
+SEARCH_AUTOMATIC_RE = re.compile(r'^SEARCH (?:TABLE )?(?P<table>\w+).*USING AUTOMATIC')
+SUBQUERY_RE = re.compile(r'^(?:CO-ROUTINE|MATERIALIZE) (?P<name>\S+)')
+TEMP_BTREE_RE = re.compile(r'USE TEMP B-TREE FOR (?P<clause>.+)$')
+PARAMS_RE = re.compile(r"%s|'[^']*'|\b\d+\b")
+IN_LIST_RE = re.compile(r'\bIN \(\?(?:\s*,\s*\?)*\)', re.I)
+SELECT_LIST_RE = re.compile(r'^\s*SELECT\s+(?:DISTINCT\s+)?.*?\sFROM\s', re.S)
+
+
+def find_origin():
+    """
+    Откуда выполнен запрос: строка шаблона (ближайший узел шаблона в стеке)
+    и строка кода проекта
+    """
+    template = code = None
+    base_dir = str(settings.BASE_DIR)
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        # Первая строка кода проекта, не считая самого аудита и точек входа команд
+        if code is None and filename.startswith(base_dir) and filename != __file__ \
+                and f'{os.sep}management{os.sep}' not in filename and not filename.endswith('manage.py'):
+            code = f'{Path(filename).relative_to(base_dir)}:{frame.f_lineno}'
+        node = frame.f_locals.get('self')
+        # type() вместо isinstance: ленивые объекты (request.user) не должны вычисляться
+        if template is None and issubclass(type(node), Node) and getattr(node, 'token', None) and node.origin:
+            template = f'{node.origin.template_name}:{node.token.lineno}'
+        if template and code:
+            break
+        frame = frame.f_back
+    return template, code
+
+
+class QueryRecorder:
+    """
+    Обёртка выполнения запросов (connection.execute_wrapper): SQL, параметры и место вызова
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many:
+            template, code = find_origin()
+            self.queries.append({'sql': sql, 'params': params, 'template': template, 'code': code})
+        return execute(sql, params, many, context)
+
+
+def explain(connection, sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def analyze_plan(plan):
+    """
+    Проблемы плана SQLite: полный просмотр таблицы, временное B-дерево для
+    ORDER BY/GROUP BY и автоматический индекс (признак отсутствующего индекса).
+    Просмотр результата подзапроса (CO-ROUTINE, MATERIALIZE) - не просмотр таблицы
+    """
+    findings = []
+    subqueries = {match.group('name') for match in map(SUBQUERY_RE.match, plan) if match}
+    for detail in plan:
+        scan = SCAN_RE.match(detail)
+        if scan and 'USING' not in scan.group('rest') and scan.group('table') not in subqueries:
+            findings.append(('table-scan', scan.group('table'), detail))
+        automatic = SEARCH_AUTOMATIC_RE.match(detail)
+        if automatic or 'AUTOMATIC' in detail:
+            table = automatic.group('table') if automatic else ''
+            findings.append(('missing-index', table, detail))
+        temp_btree = TEMP_BTREE_RE.search(detail)
+        if temp_btree:
+            findings.append(('temp-b-tree', temp_btree.group('clause'), detail))
+    return findings
+
+
+def normalize_sql(sql):
+    """
+    SQL без значений параметров и списка колонок: добавление поля в выборку
+    не меняет план и не должно давать новую находку. Список IN (?, ?, ...)
+    сворачивается, иначе число значений (размер страницы) меняло бы отпечаток
+    """
+    sql = PARAMS_RE.sub('?', SELECT_LIST_RE.sub('SELECT ... FROM ', sql, count=1))
+    return IN_LIST_RE.sub('IN (...)', sql)
+
+
+def fingerprint(kind, subject, view, sql):
+    """
+    Устойчивый идентификатор находки для сравнения с базовой линией
+    """
+    source = '|'.join((kind, subject, view or '', normalize_sql(sql)))
+    return hashlib.sha1(source.encode()).hexdigest()[:16]
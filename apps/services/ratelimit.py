@@ -0,0 +1,210 @@
+import math
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files import locks
+from django.http import HttpResponse, JsonResponse
+
+from .utils import get_client_ip
+
+
+RATE_PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+# Кеши, чей incr атомарен и не меняет срок жизни ключа
+ATOMIC_INCR_BACKENDS = {
+    'django.core.cache.backends.redis.RedisCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+}
+
+
+def get_ratelimit_cache_alias():
+    return getattr(settings, 'RATELIMIT_CACHE_ALIAS', 'default')
+
+
+def get_ratelimit_cache():
+    return caches[get_ratelimit_cache_alias()]
+
+
+def has_atomic_incr(cache):
+    return any(f'{cls.__module__}.{cls.__qualname__}' in ATOMIC_INCR_BACKENDS for cls in type(cache).__mro__)
+
+
+@contextmanager
+def counter_lock():
+    """
+    Межпроцессная блокировка счётчиков файлового кеша (файл в его каталоге)
+    """
+    location = settings.CACHES[get_ratelimit_cache_alias()]['LOCATION']
+    os.makedirs(location, exist_ok=True)
+    with open(os.path.join(location, 'ratelimit.lock'), 'ab') as lock_file:
+        locks.lock(lock_file, locks.LOCK_EX)
+        try:
+            yield
+        finally:
+            locks.unlock(lock_file)
+
+
+def incr_counter(key, timeout):
+    """
+    Атомарное увеличение счётчика: для файлового кеша - чтение и запись под
+    блокировкой файла (его incr - это get и set, к тому же записывающий ключ
+    со сроком жизни по умолчанию), для остальных - add и incr кеша
+    """
+    cache = get_ratelimit_cache()
+    if isinstance(cache, FileBasedCache):
+        with counter_lock():
+            value = cache.get(key, 0) + 1
+            cache.set(key, value, timeout)
+            return value
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Ключ истёк между add и incr
+        cache.set(key, 1, timeout)
+        return 1
+
+
+def check_ratelimit_cache(app_configs=None, **kwargs):
+    """
+    Проверка системы: лимиты соблюдаются только на кеше с атомарными счётчиками
+    """
+    if not getattr(settings, 'RATE_LIMITS', None):
+        return []
+    alias = get_ratelimit_cache_alias()
+    cache = caches[alias]
+    if has_atomic_incr(cache) or isinstance(cache, FileBasedCache):
+        return []
+    if isinstance(cache, LocMemCache):
+        return [checks.Warning(
+            f'Кеш ограничения частоты «{alias}» локален для процесса: лимиты считаются отдельно в каждом воркере',
+            hint='Укажите в RATELIMIT_CACHE_ALIAS файловый кеш, Redis или Memcached',
+            id='ratelimit.W001',
+        )]
+    return [checks.Error(
+        f'Кеш ограничения частоты «{alias}» ({type(cache).__name__}) не поддерживает атомарное увеличение счётчиков',
+        hint='Укажите в RATELIMIT_CACHE_ALIAS файловый кеш, Redis или Memcached',
+        id='ratelimit.E001',
+    )]
+
+
+def parse_rate(rate):
+    """
+    Лимит вида '10/m' -> (10, 60)
+    """
+    count, _, period = rate.partition('/')
+    return int(count), RATE_PERIODS[period.strip()[:1]]
+
+
+def get_rate(group):
+    rate = getattr(settings, 'RATE_LIMITS', {}).get(group)
+    return parse_rate(rate) if rate else None
+
+
+def rejected_counter_key(group):
+    return f'ratelimit-rejected-{group}'
+
+
+def hit(identity, limit, period):
+    """
+    Скользящее окно: счётчик текущего окна плюс доля предыдущего.
+    Возвращает None, если лимит не превышен, иначе число секунд до повтора
+    """
+    cache = get_ratelimit_cache()
+    now = time.time()
+    window = int(now // period)
+    current = incr_counter(f'ratelimit-{identity}-{window}', period * 2)
+    previous = cache.get(f'ratelimit-{identity}-{window - 1}', 0)
+    elapsed = now / period - window
+    if previous * (1 - elapsed) + current <= limit:
+        return None
+    return max(1, math.ceil(period * (1 - elapsed)))
+
+
+def check_rate_limit(request, group, keys=('ip', 'user')):
+    """
+    Проверка всех ключей группы (IP и пользователь); только кеш, без запросов к БД
+    """
+    rate = get_rate(group)
+    if rate is None:
+        return None
+    limit, period = rate
+    identities = []
+    if 'ip' in keys:
+        identities.append(f'{group}-ip-{get_client_ip(request)}')
+    if 'user' in keys and request.user.is_authenticated:
+        identities.append(f'{group}-user-{request.user.pk}')
+    for identity in identities:
+        retry_after = hit(identity, limit, period)
+        if retry_after is not None:
+            incr_counter(rejected_counter_key(group), None)
+            return retry_after
+    return None
+
+
+def ratelimited_response(request, retry_after):
+    """
+    Дешёвый ответ 429 (JSON для AJAX-запросов)
+    """
+    message = 'Слишком много запросов, попробуйте позже'
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        response = JsonResponse({'error': message}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+class RateLimitMixin:
+    """
+    Ограничение частоты запросов к представлению, должен стоять первым в списке предков
+    """
+
+    ratelimit_group = None
+    ratelimit_keys = ('ip', 'user')
+    ratelimit_methods = ('POST',)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in self.ratelimit_methods:
+            retry_after = check_rate_limit(request, self.ratelimit_group, self.ratelimit_keys)
+            if retry_after is not None:
+                return ratelimited_response(request, retry_after)
+        return super().dispatch(request, *args, **kwargs)
+
+
+def ratelimit(group, keys=('ip', 'user'), methods=('POST',)):
+    """
+    Декоратор для функций-представлений с теми же правилами, что и RateLimitMixin
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method in methods:
+                retry_after = check_rate_limit(request, group, keys)
+                if retry_after is not None:
+                    return ratelimited_response(request, retry_after)
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_rejected_counters():
+    """
+    Число отклонённых запросов по группам из RATE_LIMITS
+    """
+    groups = list(getattr(settings, 'RATE_LIMITS', {}))
+    values = get_ratelimit_cache().get_many([rejected_counter_key(group) for group in groups])
+    return {group: values.get(rejected_counter_key(group), 0) for group in groups}
+
+
+def reset_rejected_counters():
+    groups = list(getattr(settings, 'RATE_LIMITS', {}))
+    get_ratelimit_cache().delete_many([rejected_counter_key(group) for group in groups])
@@ -0,0 +1,176 @@
+import gzip
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.finders import FileSystemFinder
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import cached_property
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_EXTENSIONS = ('.js', '.css', '.svg', '.json', '.txt', '.xml', '.html', '.map')
+MINIFIABLE_EXTENSIONS = ('.js', '.css')
+COMPRESSED_EXTENSIONS = {'br': '.br', 'gzip': '.gz'}
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+HASHED_PART_RE = re.compile(r'\.[0-9a-f]{12}(\.[^/.]+)$')
+
+
+def minify(content, extension):
+    """
+    Консервативная минификация: пустые строки, отступы и комментарии
+    на отдельной строке, содержимое шаблонных строк JS не затрагивается
+    """
+    if extension == '.css':
+        content = CSS_COMMENT_RE.sub('', content)
+    lines = []
+    in_template = False
+    for line in content.splitlines():
+        stripped = line.strip()
+        if not in_template:
+            if not stripped or (extension == '.js' and stripped.startswith('//')):
+                continue
+            line = stripped
+        if extension == '.js' and (line.count('`') - line.count('\\`')) % 2:
+            in_template = not in_template
+        lines.append(line)
+    return '\n'.join(lines) + '\n'
+
+
+def get_compress_min_size():
+    return getattr(settings, 'STATIC_COMPRESS_MIN_SIZE', 256)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Хранилище статики для collectstatic: минификация JS и CSS, имена
+    с хешем содержимого и заранее сжатые копии .gz и .br (если установлен brotli)
+    """
+
+    # Без собранного манифеста {% static %} отдаёт исходные имена
+    manifest_strict = False
+
+    @cached_property
+    def project_files(self):
+        """
+        Собственные файлы проекта (STATICFILES_DIRS): сторонние приложения
+        поставляют статику уже подготовленной, её не минифицируем
+        """
+        return {path.replace('\\', '/') for path, storage in FileSystemFinder().list([])}
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Файл ещё не собран в STATIC_ROOT
+            return name
+
+    def _save(self, name, content):
+        extension = os.path.splitext(name)[1].lower()
+        # Копия с хешем пишется из исходного файла, поэтому минифицируется отдельно
+        source_name = HASHED_PART_RE.sub(r'\1', name)
+        if extension in MINIFIABLE_EXTENSIONS and source_name in self.project_files:
+            content.seek(0)
+            source = content.read()
+            if isinstance(source, bytes):
+                source = source.decode('utf-8')
+            content = ContentFile(minify(source, extension).encode('utf-8'))
+        return super()._save(name, content)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(set(paths).union(self.hashed_files.values())):
+            if name.lower().endswith(COMPRESSIBLE_EXTENSIONS) and self.exists(name):
+                compressed = self.compress(name)
+                if compressed:
+                    yield name, compressed, True
+
+    def compress(self, name):
+        """
+        Запись сжатых копий рядом с файлом, если они действительно меньше
+        """
+        path = self.path(name)
+        with open(path, 'rb') as source:
+            content = source.read()
+        if len(content) < get_compress_min_size():
+            return None
+        variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(content, quality=11)
+        written = []
+        for suffix, data in variants.items():
+            if len(data) < len(content):
+                with open(path + suffix, 'wb') as target:
+                    target.write(data)
+                written.append(name + suffix)
+        return ', '.join(written) or None
+
+
+def parse_accept_encoding(header):
+    """
+    Кодировки, которые принимает клиент (с ненулевым q)
+    """
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def serve_static(request, path):
+    """
+    Отдача собранной статики: выбор .br/.gz по Accept-Encoding и вечный
+    immutable-кеш для имён с хешем содержимого
+    """
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except ValueError:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    stat = os.stat(full_path)
+    if not was_modified_since(request.headers.get('If-Modified-Since'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    accepted = parse_accept_encoding(request.headers.get('Accept-Encoding', ''))
+    serve_path, encoding = full_path, None
+    for coding, suffix in COMPRESSED_EXTENSIONS.items():
+        if coding in accepted and os.path.isfile(full_path + suffix):
+            serve_path, encoding = full_path + suffix, coding
+            break
+
+    response = FileResponse(open(serve_path, 'rb'), content_type=content_type)
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    if path.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+        patch_vary_headers(response, ('Accept-Encoding',))
+    if HASHED_NAME_RE.search(path):
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response['Cache-Control'] = 'public, max-age=300'
+    return response
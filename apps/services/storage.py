@@ -0,0 +1,93 @@
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+HASHED_NAME_RE = re.compile(r'(^|/)[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}[^/]*$')
+
+
+def get_upload_max_size():
+    """
+    Максимальный размер загружаемого файла в байтах
+    """
+    return getattr(settings, 'UPLOAD_MAX_SIZE', 5 * 1024 * 1024)
+
+
+def validate_upload_size(file):
+    """
+    Проверка размера загружаемого файла до его сохранения
+    """
+    max_size = get_upload_max_size()
+    if max_size and file.size > max_size:
+        raise ValidationError(f'Размер файла превышает {max_size // 1024} КБ')
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Файловое хранилище с адресацией по содержимому: файл потоково записывается
+    во временный файл с подсчётом SHA-256 и сохраняется один раз под именем
+    <каталог>/<aa>/<bb>/<хеш><расширение>, повторные загрузки переиспользуют его
+    """
+
+    chunk_size = 64 * 1024
+
+    def get_available_name(self, name, max_length=None):
+        """
+        Итоговое имя определяется содержимым файла в _save
+        """
+        return name
+
+    def _save(self, name, content):
+        name = name.replace('\\', '/')
+        if HASHED_NAME_RE.search(name):
+            # Производные файлы (например, миниатюры CKEditor) уже названы по хешу оригинала
+            if self.exists(name):
+                return name
+            return super()._save(name, content)
+
+        root = name.split('/', 1)[0] if '/' in name else ''
+        extension = os.path.splitext(name)[1].lower()
+        temp_dir = self.path(posixpath.join(root, '.tmp'))
+        os.makedirs(temp_dir, exist_ok=True)
+
+        max_size = get_upload_max_size()
+        hasher = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=temp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                for chunk in content.chunks(self.chunk_size):
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    size += len(chunk)
+                    if max_size and size > max_size:
+                        raise ValidationError(f'Размер файла превышает {max_size // 1024} КБ')
+                    hasher.update(chunk)
+                    temp_file.write(chunk)
+
+            digest = hasher.hexdigest()
+            name = posixpath.join(root, digest[:2], digest[2:4], digest + extension)
+            full_path = self.path(name)
+            if os.path.exists(full_path):
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                os.replace(temp_path, full_path)
+                if self.file_permissions_mode is not None:
+                    os.chmod(full_path, self.file_permissions_mode)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
+
+
+content_storage = ContentAddressedStorage()
@@ -0,0 +1,41 @@
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse, JsonResponse
+from django.utils.html import escape, escapejs
+
+from ckeditor_uploader.views import ImageUploadView
+
+from .storage import get_upload_max_size
+
+
+class CKEditorUploadView(ImageUploadView):
+    """
+    Загрузка файлов CKEditor с проверкой UPLOAD_MAX_SIZE до сохранения: ошибка
+    возвращается редактору ответом 4xx, а не исключением хранилища (500)
+    """
+
+    def post(self, request, **kwargs):
+        uploaded_file = request.FILES.get('upload')
+        if uploaded_file is None:
+            return self.upload_error(request, 'Файл не передан', status=400)
+        max_size = get_upload_max_size()
+        if max_size and uploaded_file.size > max_size:
+            return self.upload_error(request, f'Размер файла превышает {max_size // 1024} КБ', status=413)
+        try:
+            return super().post(request, **kwargs)
+        except ValidationError as error:
+            # Проверка в хранилище остаётся страховкой (например, для потоковых загрузок)
+            return self.upload_error(request, ' '.join(error.messages), status=400)
+
+    def upload_error(self, request, message, status):
+        """
+        Ошибка в формате CKEditor 4: вызов функции окна для загрузки через iframe, иначе JSON
+        """
+        ck_func_num = request.GET.get('CKEditorFuncNum')
+        if ck_func_num:
+            return HttpResponse(
+                f"<script type='text/javascript'>"
+                f"window.parent.CKEDITOR.tools.callFunction({escape(ck_func_num)}, '', '{escapejs(message)}');"
+                f"</script>",
+                status=status,
+            )
+        return JsonResponse({'uploaded': 0, 'error': {'message': message}}, status=status)
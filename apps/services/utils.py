@@ -1,4 +1,8 @@
+import hashlib
 from uuid import uuid4
+
+from django.conf import settings
+from django.db import connections
 from pytils.translit import slugify
 
 
@@ -13,3 +17,42 @@ def unique_slugify(instance, slug, slug_field):
     elif model.objects.filter(slug=slug_field) and model.objects.filter(slug=slug_field).last().id != instance.id:
         unique_slug = f'{slugify(slug)}-{uuid4().hex[:8]}'
     return unique_slug
+
+
+def get_client_ip(request):
+    """
+    IP-адрес клиента. X-Forwarded-For учитывается только при доверенных прокси
+    (TRUSTED_PROXY_COUNT): каждый прокси дописывает адрес справа, поэтому
+    берётся N-й адрес с конца, а левые значения, присланные клиентом, игнорируются
+    """
+    proxy_count = getattr(settings, 'TRUSTED_PROXY_COUNT', 0)
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if proxy_count and x_forwarded_for:
+        addresses = [address.strip() for address in x_forwarded_for.split(',') if address.strip()]
+        if addresses:
+            return addresses[-min(proxy_count, len(addresses))]
+    return request.META.get('REMOTE_ADDR')
+
+
+def hash_ip_address(ip_address, size=8):
+    """
+    Короткий хеш IP-адреса с ключом из SECRET_KEY: сам адрес не восстановить,
+    а повторное появление того же адреса распознаётся
+    """
+    key = hashlib.blake2b(settings.SECRET_KEY.encode(), digest_size=32).digest()
+    return hashlib.blake2b(ip_address.encode(), key=key, digest_size=size).digest()
+
+
+def bulk_delete(queryset):
+    """
+    Удаление строк выборки одним DELETE без загрузки объектов и без сигналов
+    удаления: поправки, которые сделали бы обработчики, выполняет вызывающий код.
+    Только для моделей без зависимых строк (каскад тоже не выполняется)
+    """
+    connection = connections[queryset.db]
+    subquery, params = queryset.order_by().values('pk').query.sql_with_params()
+    table = connection.ops.quote_name(queryset.model._meta.db_table)
+    pk_column = connection.ops.quote_name(queryset.model._meta.pk.column)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE {pk_column} IN ({subquery})', params)
+        return cursor.rowcount
@@ -0,0 +1,219 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from importlib import import_module
+from pathlib import Path
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = ('.html', '.xml', '.txt')
+APP_SUBMODULES = ('admin', 'forms', 'views', 'urls', 'api', 'feeds', 'sitemaps', 'signals', 'widgets')
+
+
+def import_app_modules():
+    """
+    Импорт модулей приложений, которые Django загружает только при первом обращении
+    """
+    from django.apps import apps
+
+    imported = 0
+    for app_config in apps.get_app_configs():
+        for submodule in APP_SUBMODULES:
+            try:
+                import_module(f'{app_config.name}.{submodule}')
+            except ModuleNotFoundError as error:
+                if error.name != f'{app_config.name}.{submodule}':
+                    raise
+            else:
+                imported += 1
+        templatetags = Path(app_config.path) / 'templatetags'
+        for path in templatetags.glob('*.py'):
+            import_module(f'{app_config.name}.templatetags.{path.stem}')
+            imported += 1
+    return imported
+
+
+def compile_templates():
+    """
+    Компиляция всех шаблонов из каталогов TEMPLATES['DIRS'] в кеширующий загрузчик
+    """
+    from django.template import engines
+
+    compiled = 0
+    for engine in engines.all():
+        for directory in getattr(engine, 'dirs', []):
+            directory = Path(directory)
+            for path in sorted(directory.rglob('*')):
+                if path.suffix not in TEMPLATE_EXTENSIONS:
+                    continue
+                engine.get_template(path.relative_to(directory).as_posix())
+                compiled += 1
+    return compiled
+
+
+def resolve_urls():
+    """
+    Заполнение резолвера и компиляция регулярных выражений всех именованных адресов
+    """
+    from django.urls import NoReverseMatch, get_resolver, resolve, reverse
+
+    resolver = get_resolver()
+    names = [name for name in resolver.reverse_dict if isinstance(name, str)]
+    for namespace, (prefix, sub_resolver) in resolver.namespace_dict.items():
+        names.extend(f'{namespace}:{name}' for name in sub_resolver.reverse_dict if isinstance(name, str))
+    resolved = 0
+    for name in names:
+        try:
+            path = reverse(name)
+        except NoReverseMatch:
+            # Адрес с параметрами: достаточно заполненного reverse_dict
+            continue
+        resolve(path)
+        resolved += 1
+    return resolved
+
+
+def prime_caches():
+    """
+    Заполнение горячих кешей: дерево категорий и фрагменты макета на главной, индекс карты сайта
+    """
+    from django.contrib.auth.models import AnonymousUser
+    from django.contrib.sessions.backends.base import SessionBase
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import RequestFactory
+    from django.urls import resolve
+
+    from apps.blog.sitemaps import SITEMAP_INDEX_CACHE_KEY, render_sitemap_index
+
+    connection.ensure_connection()
+    primed = ['home']
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    request.session = SessionBase()
+    match = resolve(request.path_info)
+    response = match.func(request, *match.args, **match.kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    if cache.get(SITEMAP_INDEX_CACHE_KEY) is None:
+        render_sitemap_index()
+        primed.append('sitemap')
+    return len(primed)
+
+
+def build_autocomplete():
+    """
+    Построение индекса подсказок поиска, чтобы первый запрос не ждал загрузки
+    """
+    from apps.blog.autocomplete import autocomplete_index
+
+    autocomplete_index.build()
+    return autocomplete_index.index.stats()['items']
+
+
+WARMUP_STEPS = (
+    ('imports', import_app_modules),
+    ('templates', compile_templates),
+    ('urls', resolve_urls),
+    ('caches', prime_caches),
+    ('autocomplete', build_autocomplete),
+)
+
+
+def warmup(raise_errors=False):
+    """
+    Прогрев процесса после запуска: каждый шаг выполняется независимо,
+    ошибка шага (например, не применены миграции) не мешает запуску
+    """
+    report = []
+    for name, step in WARMUP_STEPS:
+        started = time.perf_counter()
+        try:
+            count = step()
+        except Exception:
+            if raise_errors:
+                raise
+            logger.exception('Ошибка прогрева: %s', name)
+            count = None
+        report.append((name, count, time.perf_counter() - started))
+    logger.info('Прогрев: %s', ', '.join(f'{name} {elapsed * 1000:.0f} мс' for name, count, elapsed in report))
+    return report
+
+
+def warmup_on_startup():
+    """
+    Вызов из wsgi.py/asgi.py, управляется настройкой WARMUP_ON_STARTUP
+    """
+    if getattr(settings, 'WARMUP_ON_STARTUP', False):
+        warmup()
+
+
+def profile_startup():
+    """
+    Время импорта, загрузки моделей и ready() каждого приложения при запуске
+    Django с нуля; запускается в отдельном процессе, результат - JSON в stdout
+    """
+    from django.apps import AppConfig
+
+    timings = {}
+    create = AppConfig.create.__func__
+    import_models = AppConfig.import_models
+
+    def timed_create(cls, entry):
+        started = time.perf_counter()
+        app_config = create(cls, entry)
+        timings[app_config.label] = {'name': app_config.name, 'import': time.perf_counter() - started}
+        ready = app_config.ready
+
+        def timed_ready():
+            started = time.perf_counter()
+            ready()
+            timings[app_config.label]['ready'] = time.perf_counter() - started
+
+        app_config.ready = timed_ready
+        return app_config
+
+    def timed_import_models(self):
+        started = time.perf_counter()
+        import_models(self)
+        timings[self.label]['models'] = time.perf_counter() - started
+
+    AppConfig.create = classmethod(timed_create)
+    AppConfig.import_models = timed_import_models
+
+    import django
+
+    started = time.perf_counter()
+    django.setup()
+    setup_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    warmup_report = warmup()
+    json.dump({
+        'apps': timings,
+        'setup': setup_time,
+        'warmup': [[name, elapsed] for name, count, elapsed in warmup_report],
+        'warmup_total': time.perf_counter() - started,
+    }, sys.stdout)
+
+
+def run_startup_report():
+    """
+    Запуск profile_startup в чистом интерпретаторе
+    """
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'blog_cbv.settings'),
+        PYTHONPATH=os.pathsep.join(path for path in sys.path if path),
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', 'from apps.services.warmup import profile_startup; profile_startup()'],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
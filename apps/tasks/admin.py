@@ -0,0 +1,48 @@
+from django.contrib import admin, messages
+from django.db import IntegrityError, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from apps.services.paginator import EstimatedCountPaginator
+
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    """
+    Админ-панель очереди фоновых задач
+    """
+
+    list_display = ('id', 'name', 'status', 'attempts', 'run_at', 'started_at', 'finished_at', 'locked_by')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'dedup_key')
+    readonly_fields = ('attempts', 'locked_by', 'created_at', 'started_at', 'finished_at', 'last_error')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('retry',)
+
+    @admin.action(description='Повторить выбранные задачи')
+    def retry(self, request, queryset):
+        """
+        Задача с ключом дедупликации повторяется, только если такой же нет в очереди,
+        и из нескольких выбранных с одним ключом - только последняя
+        """
+        finished = queryset.exclude(status__in=(Task.PENDING, Task.RUNNING))
+        active_keys = Task.objects.filter(
+            status__in=(Task.PENDING, Task.RUNNING), dedup_key__isnull=False,
+        ).values('dedup_key')
+        latest_ids = (
+            finished.filter(dedup_key__isnull=False).exclude(dedup_key__in=active_keys)
+            .order_by().values('dedup_key').annotate(latest=Max('id')).values('latest')
+        )
+        retried = finished.filter(Q(dedup_key__isnull=True) | Q(pk__in=latest_ids))
+        try:
+            with transaction.atomic():
+                updated = retried.update(status=Task.PENDING, attempts=0, run_at=timezone.now(), locked_by='')
+        except IntegrityError:
+            # Такую же задачу поставили в очередь одновременно с действием
+            self.message_user(request, 'Задачи уже в очереди, повторите действие позже', messages.WARNING)
+            return
+        skipped = queryset.count() - updated
+        self.message_user(request, f'Возвращено в очередь: {updated}, пропущено: {skipped}')
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class TasksConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.tasks'
+    verbose_name = 'Фоновые задачи'
+
+    def ready(self):
+        # Регистрация задач из модулей tasks.py всех приложений
+        autodiscover_modules('tasks')
@@ -0,0 +1,61 @@
+import multiprocessing
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.tasks.worker import Worker, maintain
+
+
+def run_worker():
+    Worker().run()
+
+
+class Command(BaseCommand):
+    help = 'Запуск воркеров очереди фоновых задач'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1,
+                            help='Число процессов-воркеров')
+        parser.add_argument('--once', action='store_true',
+                            help='Выполнить готовые задачи в текущем процессе и выйти')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            maintain()
+            processed = Worker().run(once=True)
+            self.stdout.write(self.style.SUCCESS(f'Выполнено задач: {processed}'))
+            return
+
+        stopping = False
+
+        def stop(*args):
+            nonlocal stopping
+            stopping = True
+
+        # Дочерние процессы не должны разделять соединения с БД родителя
+        connections.close_all()
+        workers = [multiprocessing.Process(target=run_worker, name=f'worker-{number}')
+                   for number in range(options['processes'])]
+        for worker in workers:
+            worker.start()
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        self.stdout.write(f'Запущено воркеров: {len(workers)}')
+
+        interval = getattr(settings, 'TASKS_MAINTAIN_INTERVAL', 30)
+        next_maintain = 0
+        while not stopping and any(worker.is_alive() for worker in workers):
+            if time.monotonic() >= next_maintain:
+                maintain()
+                next_maintain = time.monotonic() + interval
+            time.sleep(0.5)
+
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+        for worker in workers:
+            worker.join()
+        self.stdout.write(self.style.SUCCESS('Воркеры остановлены'))
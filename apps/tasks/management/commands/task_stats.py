@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Состояние очереди фоновых задач и пропускная способность'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--period', type=int, default=3600,
+                            help='Период расчёта пропускной способности в секундах')
+
+    def handle(self, *args, **options):
+        period = options['period']
+        by_status, throughput = Task.objects.stats(period)
+        for status, label in Task.STATUS_OPTIONS:
+            self.stdout.write(f'{label}: {by_status.get(status, 0)}')
+        self.stdout.write(f'За последние {period} с:')
+        for row in throughput:
+            duration = row['duration'].total_seconds() if row['duration'] else 0
+            self.stdout.write(
+                f'  {row["name"]}: выполнено {row["done"]} ({row["done"] * 60 / period:.2f}/мин), '
+                f'ошибок {row["failed"]}, среднее время {duration:.3f} с'
+            )
@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+from django.db import models
+from django.db.models import Avg, Count, F, Q
+from django.utils import timezone
+
+
+class TaskManager(models.Manager):
+
+    def due(self, now=None):
+        """
+        Задачи, готовые к выполнению, в порядке очереди
+        """
+        return self.filter(status=Task.PENDING, run_at__lte=now or timezone.now()).order_by('run_at', 'id')
+
+    def claim(self, task_id, worker):
+        """
+        Захват задачи условным UPDATE: выполнит только тот воркер, чей UPDATE изменил строку
+        """
+        return self.filter(pk=task_id, status=Task.PENDING).update(
+            status=Task.RUNNING, locked_by=worker, started_at=timezone.now(), attempts=F('attempts') + 1,
+        ) == 1
+
+    def release_stale(self, timeout):
+        """
+        Возврат в очередь задач, чей воркер завис или был остановлен; задачи,
+        исчерпавшие попытки, помечаются ошибкой, а не перезапускаются бесконечно
+        """
+        now = timezone.now()
+        stale = self.filter(status=Task.RUNNING, started_at__lt=now - timedelta(seconds=timeout))
+        stale.filter(attempts__gte=F('max_attempts')).update(
+            status=Task.FAILED, locked_by='', finished_at=now,
+            last_error=f'Воркер не завершил задачу за {timeout} с',
+        )
+        return stale.update(status=Task.PENDING, locked_by='', run_at=now)
+
+    def purge(self, older_than):
+        """
+        Удаление выполненных задач старше older_than секунд
+        """
+        deadline = timezone.now() - timedelta(seconds=older_than)
+        deleted, _ = self.filter(status=Task.DONE, finished_at__lt=deadline).delete()
+        return deleted
+
+    def stats(self, period=3600):
+        """
+        Число задач по статусам и пропускная способность за последние period секунд
+        """
+        since = timezone.now() - timedelta(seconds=period)
+        by_status = dict(self.order_by().values_list('status').annotate(total=Count('id')))
+        throughput = (
+            self.filter(finished_at__gte=since).order_by().values('name')
+            .annotate(
+                done=Count('id', filter=Q(status=Task.DONE)),
+                failed=Count('id', filter=Q(status=Task.FAILED)),
+                duration=Avg(F('finished_at') - F('started_at')),
+            )
+            .order_by('name')
+        )
+        return by_status, list(throughput)
+
+
+class Task(models.Model):
+    """
+    Фоновая задача в очереди на базе таблицы
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_OPTIONS = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(verbose_name='Задача', max_length=255)
+    args = models.JSONField(verbose_name='Аргументы', default=list, blank=True)
+    kwargs = models.JSONField(verbose_name='Именованные аргументы', default=dict, blank=True)
+    dedup_key = models.CharField(verbose_name='Ключ дедупликации', max_length=255, null=True, blank=True)
+    status = models.CharField(verbose_name='Статус', choices=STATUS_OPTIONS, default=PENDING, max_length=10)
+    attempts = models.PositiveIntegerField(verbose_name='Попыток', default=0)
+    max_attempts = models.PositiveIntegerField(verbose_name='Максимум попыток', default=3)
+    run_at = models.DateTimeField(verbose_name='Выполнить после', default=timezone.now)
+    locked_by = models.CharField(verbose_name='Воркер', max_length=100, blank=True)
+    created_at = models.DateTimeField(verbose_name='Время добавления', auto_now_add=True)
+    started_at = models.DateTimeField(verbose_name='Время запуска', null=True, blank=True)
+    finished_at = models.DateTimeField(verbose_name='Время завершения', null=True, blank=True)
+    last_error = models.TextField(verbose_name='Последняя ошибка', blank=True)
+
+    objects = TaskManager()
+
+    class Meta:
+        ordering = ('-id',)
+        indexes = [models.Index(fields=['status', 'run_at'])]
+        constraints = [
+            # Одна активная задача на ключ; выполненные не мешают поставить её снова
+            models.UniqueConstraint(
+                fields=['dedup_key'],
+                condition=Q(status__in=['pending', 'running']),
+                name='task_active_dedup_key',
+            ),
+        ]
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
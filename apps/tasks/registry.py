@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Task
+
+
+REGISTRY = {}
+
+
+class TaskFunction:
+    """
+    Зарегистрированная задача: вызывается как обычная функция или ставится в очередь через enqueue
+    """
+
+    def __init__(self, func, name, max_attempts, backoff):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, dedup_key=None, eta=None, countdown=None, **kwargs):
+        """
+        Постановка в очередь одним INSERT; при активной задаче с тем же dedup_key ничего не делает
+        """
+        if getattr(settings, 'TASKS_EAGER', False):
+            self.func(*args, **kwargs)
+            return None
+        if eta is None:
+            eta = timezone.now() + timedelta(seconds=countdown or 0)
+        task = Task(name=self.name, args=list(args), kwargs=kwargs, dedup_key=dedup_key,
+                    max_attempts=self.max_attempts, run_at=eta)
+        Task.objects.bulk_create([task], ignore_conflicts=dedup_key is not None)
+        return task
+
+    def get_retry_delay(self, attempts):
+        """
+        Экспоненциальная задержка перед повтором
+        """
+        return self.backoff * 2 ** max(attempts - 1, 0)
+
+
+def task(name=None, max_attempts=3, backoff=30):
+    """
+    Декоратор регистрации фоновой задачи
+    """
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        task_function = TaskFunction(func, task_name, max_attempts, backoff)
+        REGISTRY[task_name] = task_function
+        return task_function
+    return decorator
@@ -0,0 +1,115 @@
+import logging
+import os
+import signal
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, close_old_connections
+from django.utils import timezone
+
+from .models import Task
+from .registry import REGISTRY
+
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """
+    Процесс-воркер: забирает готовые задачи из таблицы и выполняет их
+    """
+
+    def __init__(self, name=None, poll_interval=None, batch_size=10):
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.poll_interval = poll_interval or getattr(settings, 'TASKS_POLL_INTERVAL', 1.0)
+        self.batch_size = batch_size
+        self.stopping = False
+        self.processed = 0
+
+    def stop(self, *args):
+        self.stopping = True
+
+    def run(self, once=False):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        logger.info('Воркер %s запущен', self.name)
+        while not self.stopping:
+            close_old_connections()
+            try:
+                executed = self.run_batch()
+            except DatabaseError:
+                # Например, блокировка SQLite при одновременной записи: повтор на следующем круге
+                logger.warning('Воркер %s: ошибка базы данных', self.name, exc_info=True)
+                executed = 0
+            if once and not executed:
+                break
+            if not executed:
+                time.sleep(self.poll_interval)
+        logger.info('Воркер %s остановлен, выполнено задач: %s', self.name, self.processed)
+        return self.processed
+
+    def run_batch(self):
+        executed = 0
+        for task_id in Task.objects.due().values_list('id', flat=True)[:self.batch_size]:
+            if self.stopping:
+                break
+            if Task.objects.claim(task_id, self.name):
+                self.execute(Task.objects.get(pk=task_id))
+                executed += 1
+        return executed
+
+    def execute(self, task):
+        task_function = REGISTRY.get(task.name)
+        try:
+            if task_function is None:
+                raise LookupError(f'Задача {task.name} не зарегистрирована')
+            task_function(*task.args, **task.kwargs)
+        except Exception:
+            error = traceback.format_exc()
+            logger.exception('Ошибка задачи %s', task)
+            if task_function is not None and task.attempts < task.max_attempts:
+                delay = task_function.get_retry_delay(task.attempts)
+                Task.objects.filter(pk=task.pk).update(
+                    status=Task.PENDING, locked_by='', last_error=error,
+                    run_at=timezone.now() + timedelta(seconds=delay),
+                )
+            else:
+                Task.objects.filter(pk=task.pk).update(
+                    status=Task.FAILED, last_error=error, finished_at=timezone.now(),
+                )
+        else:
+            Task.objects.filter(pk=task.pk).update(status=Task.DONE, finished_at=timezone.now())
+        self.processed += 1
+
+
+def schedule_periodic(now=None):
+    """
+    Постановка периодических задач из TASKS_PERIODIC: одна задача на интервал,
+    даже если запущено несколько runworker (отметка интервала через cache.add)
+    """
+    now = now or time.time()
+    scheduled = 0
+    for name, entry in getattr(settings, 'TASKS_PERIODIC', {}).items():
+        task_function = REGISTRY.get(entry['task'])
+        if task_function is None:
+            logger.warning('Периодическая задача %s: %s не зарегистрирована', name, entry['task'])
+            continue
+        interval = entry['interval']
+        slot = int(now // interval)
+        if cache.add(f'tasks-periodic-{name}-{slot}', 1, interval):
+            task_function.enqueue(*entry.get('args', ()), dedup_key=f'periodic:{name}', **entry.get('kwargs', {}))
+            scheduled += 1
+    return scheduled
+
+
+def maintain():
+    """
+    Обслуживание очереди из главного процесса runworker
+    """
+    schedule_periodic()
+    Task.objects.release_stale(getattr(settings, 'TASKS_LOCK_TIMEOUT', 15 * 60))
+    Task.objects.purge(getattr(settings, 'TASKS_KEEP_DONE', 7 * 24 * 60 * 60))
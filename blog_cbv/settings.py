@@ -25,12 +25,14 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.sitemaps',
     'apps.blog.apps.BlogConfig',
     'taggit',
     'mptt',
     'django_mptt_admin',
     # 'debug_toolbar',
     'apps.accounts',
+    'apps.tasks',
     'django_recaptcha',
     'ckeditor_uploader',
     'ckeditor',
@@ -47,6 +49,8 @@ DEBUG_TOOLBAR_CONFIG = {
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'apps.services.middleware.CompressionMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -63,8 +67,13 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -87,6 +96,11 @@ DATABASES = {
 
 
 
+AUTHENTICATION_BACKENDS = ['apps.accounts.backends.CachedModelBackend']
+
+# Время жизни закешированного пользователя, профиля и прав
+AUTH_USER_CACHE_TIMEOUT = 60 * 60
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -123,7 +137,22 @@ STATIC_ROOM = BASE_DIR / 'static'
 STATICFILES_DIRS = [BASE_DIR / 'templates/js/']
 
 STATIC_ROOT = BASE_DIR / 'static/'
+
+# collectstatic: минификация, хеш в именах файлов и сжатые копии .gz/.br (.br - при установленном brotli)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'apps.services.staticfiles.CompressedManifestStaticFilesStorage',
+    },
+}
+# Файлы меньше этого размера не сжимаются
+STATIC_COMPRESS_MIN_SIZE = 256
+# Отдавать собранную статику самим Django (если перед ним нет веб-сервера)
+STATIC_SERVE = True
 CKEDITOR_UPLOAD_PATH = "uploads/"
+CKEDITOR_STORAGE_BACKEND = 'apps.services.storage.ContentAddressedStorage'
 CKEDITOR_CONFIGS = {
     'awesome_ckeditor': {
         'toolbar': 'full',
@@ -135,6 +164,9 @@ CKEDITOR_CONFIGS = {
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Максимальный размер загружаемых изображений (записи, аватары, CKEditor)
+UPLOAD_MAX_SIZE = 5 * 1024 * 1024
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -149,5 +181,107 @@ CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
         'LOCATION': (BASE_DIR / 'cache'),
-    }
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': (BASE_DIR / 'cache' / 'sessions'),
+        # Файловый кеш просматривает весь каталог при каждой записи, поэтому он
+        # небольшой: вытесненные сессии читаются из базы данных
+        'OPTIONS': {'MAX_ENTRIES': 2000},
+    },
 }
+
+# Сессии: чтение через локальный кеш с резервом в базе данных
+SESSION_ENGINE = 'apps.accounts.sessions'
+SESSION_CACHE_ALIAS = 'sessions'
+# Размер пачки при удалении просроченных сессий (manage.py clearsessions)
+SESSION_PURGE_BATCH_SIZE = 1000
+
+# Адрес сайта для абсолютных ссылок в карте сайта
+SITE_URL = 'http://127.0.0.1:8000'
+
+# Максимальное число адресов в одной части карты сайта
+SITEMAP_CHUNK_SIZE = 50000
+
+# Время жизни закешированных фрагментов макета (шапка, подвал, боковая панель)
+LAYOUT_CACHE_TIMEOUT = 60 * 60
+
+# Сжатие ответов: минимальный размер и время хранения сжатых страниц в кеше (по ETag)
+COMPRESSION_MIN_SIZE = 200
+COMPRESSION_CACHE_ALIAS = 'default'
+COMPRESSION_CACHE_TIMEOUT = 60 * 60
+
+# Ограничение частоты POST-запросов по IP и пользователю (скользящее окно в кеше).
+# Счётчики атомарны на Redis и Memcached (incr) и на файловом кеше (блокировка файла),
+# другие кеши отклоняются проверкой системы (manage.py check)
+RATELIMIT_CACHE_ALIAS = 'default'
+RATE_LIMITS = {
+    'rating': '30/m',
+    'comment': '10/m',
+    'login': '5/m',
+    'register': '3/h',
+}
+# Число доверенных прокси перед приложением: адрес клиента берётся из X-Forwarded-For
+# только при TRUSTED_PROXY_COUNT > 0, иначе - REMOTE_ADDR
+TRUSTED_PROXY_COUNT = 0
+
+# Прогрев воркера при запуске из wsgi.py/asgi.py (шаблоны, адреса, кеши)
+WARMUP_ON_STARTUP = True
+
+# Статический снимок анонимных страниц для отдачи через nginx (manage.py snapshot),
+# например: try_files /snapshot$uri/page-$arg_page.html /snapshot$uri/index.html /snapshot$uri/index.xml @django;
+SNAPSHOT_ENABLED = False
+SNAPSHOT_ROOT = BASE_DIR / 'snapshot'
+
+# Очередь фоновых задач (manage.py runworker --processes N)
+TASKS_EAGER = False
+TASKS_POLL_INTERVAL = 1.0
+TASKS_MAINTAIN_INTERVAL = 30
+TASKS_LOCK_TIMEOUT = 15 * 60
+TASKS_KEEP_DONE = 7 * 24 * 60 * 60
+TASKS_PERIODIC = {
+    'publish_snapshot': {'task': 'blog.publish_snapshot', 'interval': 60},
+    'rebuild_snapshot': {'task': 'blog.rebuild_snapshot', 'interval': 24 * 60 * 60},
+    'warm_caches': {'task': 'blog.warm_caches', 'interval': 10 * 60},
+    'build_sitemaps': {'task': 'blog.build_sitemaps', 'interval': 60 * 60},
+    'roll_up_ratings': {'task': 'blog.roll_up_ratings', 'interval': 10 * 60},
+    'compact_ratings': {'task': 'blog.compact_ratings', 'interval': 24 * 60 * 60},
+    'rebuild_author_stats': {'task': 'blog.rebuild_author_stats', 'interval': 24 * 60 * 60},
+    'rebuild_tag_counts': {'task': 'blog.rebuild_tag_counts', 'interval': 24 * 60 * 60},
+    'send_notification_digests': {'task': 'blog.send_notification_digests', 'interval': 60 * 60},
+    'clear_expired_sessions': {'task': 'accounts.clear_expired_sessions', 'interval': 24 * 60 * 60},
+}
+
+# Хранение оценок: голоса старше RATING_RETENTION_DAYS сворачиваются в архив записи
+# (суммы и хеши IP-адресов), почасовые свёртки для графиков хранятся RATING_HOURLY_RETENTION_DAYS
+RATING_RETENTION_DAYS = 90
+RATING_HOURLY_RETENTION_DAYS = 30
+
+# Почта: локально письма сохраняются в файлы EMAIL_FILE_PATH
+# (для вывода в консоль - django.core.mail.backends.console.EmailBackend)
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+DEFAULT_FROM_EMAIL = 'noreply@127.0.0.1'
+
+# Уведомления авторам: события дописываются в спул NOTIFICATION_SPOOL и раз в час (TASKS_PERIODIC)
+# разбираются в дайджест, отправленные хранятся NOTIFICATION_RETENTION_DAYS,
+# счётчик непрочитанных живёт в кеше NOTIFICATION_UNREAD_TIMEOUT секунд
+NOTIFICATION_SPOOL = BASE_DIR / 'notifications.spool'
+NOTIFICATION_RETENTION_DAYS = 30
+NOTIFICATION_UNREAD_TIMEOUT = 24 * 60 * 60
+
+# Кеш записей и профилей по slug и id для страниц (сбрасывается сигналами при изменении)
+OBJECT_CACHE_TIMEOUT = 10 * 60
+
+# Подсказки поиска: индекс в памяти каждого процесса (бюджет в байтах),
+# изменения других процессов читаются из журнала в кеше не чаще раза в AUTOCOMPLETE_CHECK_INTERVAL секунд
+AUTOCOMPLETE_MEMORY_BUDGET = 16 * 1024 * 1024
+AUTOCOMPLETE_CHECK_INTERVAL = 1.0
+AUTOCOMPLETE_CHANGE_TTL = 10 * 60
+
+# Поток событий записи (SSE) и межпроцессная шина через кеш
+SSE_HEARTBEAT_INTERVAL = 15
+PUBSUB_POLL_INTERVAL = 1.0
+PUBSUB_EVENT_TTL = 60
+# сколько ждать событие с пропущенным номером, прежде чем читать дальше
+PUBSUB_GAP_TIMEOUT = 5
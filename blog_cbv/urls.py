@@ -1,9 +1,17 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.contrib.admin.views.decorators import staff_member_required
+from django.urls import path, re_path, include
 from django.conf.urls.static import static
 from django.conf import settings
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_exempt
+
+from ckeditor_uploader import views as ckeditor_views
 
 from apps.blog.feeds import LatestPostFeed
+from apps.blog.sitemaps import SitemapIndexView, SitemapSectionView
+from apps.services.staticfiles import serve_static
+from apps.services.uploads import CKEditorUploadView
 
 
 handler403 = 'apps.blog.error.tr_handler403'
@@ -14,11 +22,21 @@ handler500 = 'apps.blog.error.tr_handler500'
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('feeds/latest/', LatestPostFeed(), name='latest_post_feed'),
+    path('sitemap.xml', SitemapIndexView.as_view(), name='sitemap_index'),
+    path('sitemap-<str:section>-<int:chunk>.xml', SitemapSectionView.as_view(), name='sitemap_section'),
     path('', include('apps.blog.urls')),
     path('', include('apps.accounts.urls')),
-    path('ckeditor/', include('ckeditor_uploader.urls')),
+    re_path(r'^ckeditor/upload/', staff_member_required(csrf_exempt(CKEditorUploadView.as_view())),
+            name='ckeditor_upload'),
+    re_path(r'^ckeditor/browse/', never_cache(staff_member_required(ckeditor_views.browse)),
+            name='ckeditor_browse'),
 ]
 
+if settings.STATIC_SERVE:
+    urlpatterns += [
+        re_path(rf'^{settings.STATIC_URL.lstrip("/")}(?P<path>.+)$', serve_static, name='static'),
+    ]
+
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     # urlpatterns += [path('__debug__/', include('debug_toolbar.urls'))]
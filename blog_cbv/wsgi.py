@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blog_cbv.settings')
 
 application = get_wsgi_application()
+
+from apps.services.warmup import warmup_on_startup  # noqa: E402
+
+warmup_on_startup()
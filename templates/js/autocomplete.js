@@ -0,0 +1,36 @@
+const autocompleteInput = document.getElementById('autocomplete-input');
+
+if (autocompleteInput) {
+    const autocompleteList = document.getElementById('autocomplete-list');
+    const autocompleteLabels = {post: 'Запись', tag: 'Тег', profile: 'Автор'};
+    // Адреса подсказок по подписи, чтобы перейти при выборе из списка
+    let autocompleteUrls = {};
+    let autocompleteTimer = null;
+
+    autocompleteInput.addEventListener('input', () => {
+        const value = autocompleteInput.value;
+        if (autocompleteUrls[value]) {
+            window.location.href = autocompleteUrls[value];
+            return;
+        }
+        clearTimeout(autocompleteTimer);
+        if (value.trim().length < 2) {
+            return;
+        }
+        autocompleteTimer = setTimeout(() => {
+            fetch(`${autocompleteInput.dataset.url}?q=${encodeURIComponent(value)}`)
+                .then(response => response.json())
+                .then(data => {
+                    autocompleteUrls = {};
+                    autocompleteList.replaceChildren(...data.results.map(item => {
+                        const option = document.createElement('option');
+                        const label = `${item.label} (${autocompleteLabels[item.type]})`;
+                        option.value = label;
+                        autocompleteUrls[label] = item.url;
+                        return option;
+                    }));
+                })
+                .catch(error => console.error(error));
+        }, 150);
+    });
+}
@@ -1,15 +1,112 @@
 const commentForm = document.forms.commentForm;
-const commentFormContent = commentForm.content;
-const commentFormParentInput = commentForm.parent;
-const commentFormSubmit = commentForm.commentSubmit;
-const commentPostId = commentForm.getAttribute('data-post-id');
 
-commentForm.addEventListener('submit', createComment);
+function escapeHtml(value) {
+  const element = document.createElement('div');
+  element.textContent = value;
+  return element.innerHTML;
+}
+
+// Вставка комментария в дерево (из ответа формы или из потока событий), повторы пропускаются
+function insertComment(comment) {
+  if (document.querySelector(`#comment-thread-${comment.id}`)) {
+    return;
+  }
+  const author = escapeHtml(comment.author);
+  let commentTemplate = `<ul id="comment-thread-${comment.id}">
+                                <li class="card border-0">
+                                    <div class="row">
+                                        <div class="col-md-2">
+                                            <img src="${comment.avatar}" style="width: 100px;height: 100px;object-fit: cover;" alt="${author}"/>
+                                        </div>
+                                        <div class="col-md-10">
+                                            <div class="card-body">
+                                                <h6 class="card-title">
+                                                    <a href="${comment.get_absolute_url}">${author}</a>
+                                                </h6>
+                                                <p class="card-text">
+                                                    ${escapeHtml(comment.content)}
+                                                </p>
+                                                <a class="btn btn-sm btn-dark btn-reply" href="#commentForm" data-comment-id="${comment.id}" data-comment-username="${author}">Ответить</a>
+                                                <hr/>
+                                                <time>${comment.time_create}</time>
+                                            </div>
+                                        </div>
+                                    </div>
+                                </li>
+                            </ul>`;
+  const parentThread = comment.is_child && document.querySelector(`#comment-thread-${comment.parent_id}`);
+  if (parentThread) {
+      parentThread.insertAdjacentHTML("beforeend", commentTemplate);
+  }
+  else if (comment.is_child) {
+      // Ветка ещё не загружена, ответ появится вместе с ней
+      return;
+  }
+  else {
+      document.querySelector('.nested-comments').insertAdjacentHTML("beforeend", commentTemplate)
+  }
+  if (commentForm) {
+      replyUser();
+  }
+}
+
+if (commentForm) {
+  commentForm.addEventListener('submit', createComment);
+  replyUser();
+}
+
+// Кнопки «Ещё комментарии» и «Показать ответы»: следующая страница веток или ответов
+document.addEventListener('click', event => {
+  const button = event.target.closest('.comments-more');
+  if (button) {
+    loadComments(button);
+  }
+});
 
-replyUser()
+async function loadComments(button) {
+  button.disabled = true;
+  try {
+    const response = await fetch(button.dataset.url, {
+      headers: {'X-Requested-With': 'XMLHttpRequest'},
+    });
+    const data = await response.json();
+    const fragment = document.createElement('template');
+    fragment.innerHTML = data.html;
+    // Комментарии, уже добавленные из формы или потока событий, не дублируются
+    fragment.content.querySelectorAll('ul[id^="comment-thread-"]').forEach(thread => {
+      if (document.getElementById(thread.id)) {
+        thread.remove();
+      }
+    });
+    if (button.closest('ul[id^="comment-thread-"]')) {
+      button.before(fragment.content);
+    }
+    else {
+      document.querySelector('.nested-comments').append(fragment.content);
+    }
+    if (data.next) {
+      button.dataset.url = data.next;
+      button.disabled = false;
+      if (button.closest('ul[id^="comment-thread-"]')) {
+        button.innerText = 'Ещё ответы';
+      }
+    }
+    else {
+      button.remove();
+    }
+    if (commentForm) {
+      replyUser();
+    }
+  }
+  catch (error) {
+    button.disabled = false;
+    console.log(error)
+  }
+}
 
 function replyUser() {
   document.querySelectorAll('.btn-reply').forEach(e => {
+    e.removeEventListener('click', replyComment);
     e.addEventListener('click', replyComment);
   });
 }
@@ -17,15 +114,15 @@ function replyUser() {
 function replyComment() {
   const commentUsername = this.getAttribute('data-comment-username');
   const commentMessageId = this.getAttribute('data-comment-id');
-  commentFormContent.value = `${commentUsername}, `;
-  commentFormParentInput.value = commentMessageId;
+  commentForm.content.value = `${commentUsername}, `;
+  commentForm.parent.value = commentMessageId;
 }
 async function createComment(event) {
     event.preventDefault();
-    commentFormSubmit.disabled = true;
-    commentFormSubmit.innerText = "Ожидаем ответа сервера";
+    commentForm.commentSubmit.disabled = true;
+    commentForm.commentSubmit.innerText = "Ожидаем ответа сервера";
     try {
-        const response = await fetch(`/post/${commentPostId}/comments/create/`, {
+        const response = await fetch(`/post/${commentForm.getAttribute('data-post-id')}/comments/create/`, {
             method: 'POST',
             headers: {
                 'X-CSRFToken': csrftoken,
@@ -35,39 +132,11 @@ async function createComment(event) {
         });
         const comment = await response.json();
 
-        let commentTemplate = `<ul id="comment-thread-${comment.id}">
-                                <li class="card border-0">
-                                    <div class="row">
-                                        <div class="col-md-2">
-                                            <img src="${comment.avatar}" style="width: 100px;height: 100px;object-fit: cover;" alt="${comment.author}"/>
-                                        </div>
-                                        <div class="col-md-10">
-                                            <div class="card-body">
-                                                <h6 class="card-title">
-                                                    <a href="${comment.get_absolute_url}">${comment.author}</a>
-                                                </h6>
-                                                <p class="card-text">
-                                                    ${comment.content}
-                                                </p>
-                                                <a class="btn btn-sm btn-dark btn-reply" href="#commentForm" data-comment-id="${comment.id}" data-comment-username="${comment.author}">Ответить</a>
-                                                <hr/>
-                                                <time>${comment.time_create}</time>
-                                            </div>
-                                        </div>
-                                    </div>
-                                </li>
-                            </ul>`;
-        if (comment.is_child) {
-            document.querySelector(`#comment-thread-${comment.parent_id}`).insertAdjacentHTML("beforeend", commentTemplate);
-        }
-        else {
-            document.querySelector('.nested-comments').insertAdjacentHTML("beforeend", commentTemplate)
-        }
+        insertComment(comment);
         commentForm.reset()
-        commentFormSubmit.disabled = false;
-        commentFormSubmit.innerText = "Добавить комментарий";
-        commentFormParentInput.value = null;
-        replyUser();
+        commentForm.commentSubmit.disabled = false;
+        commentForm.commentSubmit.innerText = "Добавить комментарий";
+        commentForm.parent.value = null;
     }
     catch (error) {
         console.log(error)
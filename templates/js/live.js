@@ -0,0 +1,18 @@
+// Поток событий записи: новые комментарии и сумма рейтинга без перезагрузки страницы
+const livePost = document.querySelector('[data-live-post]');
+
+if (livePost && window.EventSource) {
+    const postId = livePost.dataset.livePost;
+    const events = new EventSource(`/post/${postId}/events/`);
+
+    events.addEventListener('comment', event => {
+        insertComment(JSON.parse(event.data));
+    });
+
+    events.addEventListener('rating', event => {
+        const data = JSON.parse(event.data);
+        document.querySelectorAll(`.rating-buttons[data-post="${data.post_id}"] .rating-sum`).forEach(ratingSum => {
+            ratingSum.textContent = data.rating_sum;
+        });
+    });
+}